@@ -8,68 +8,80 @@ Utility-grade electricity billing engine supporting:
 - Smart / Prepaid Billing
 
 Designed as a pure Python library (no DB, no framework lock-in).
-"""
-
-__version__ = "0.1.0"
-
-# ===============================
-# Public Billing APIs
-# ===============================
 
-from voltengine.billing.prepaid_daily import PrepaidDailyBilling
-from voltengine.billing.prepaid_monthly import PrepaidMonthlyInvoice
+Modules are imported from the repository root, as the Streamlit app,
+api.py, the service and the benchmarks do:
 
-# (Add later when ready)
-# from voltengine.billing.lt_billing import LTBilling
-# from voltengine.billing.ht_billing import HTBilling
+    from operations.recharge import RechargeOperation
+    from billing.prepaid_daily import PrepaidDailyBilling
 
+The public classes are also exported here and resolved on first access,
+so importing the package loads nothing else. Numpy is loaded only by the
+vectorised engines, so scalar workers (recharge, daily billing, ledger)
+start without it.
+"""
 
-# ===============================
-# Public Operations
-# ===============================
+__version__ = "0.1.0"
 
-from voltengine.operations.recharge import RechargeOperation
-from voltengine.operations.installment import InstallmentEngine
-from voltengine.operations.dps import DPSCalculator
-from voltengine.operations.excess_demand import ExcessDemandPenalty
+import importlib
+import os
+import sys
 
+# Public names -> (module, attribute). Resolved on first access by
+# __getattr__, so `import voltengine` stays cheap and a worker that only
+# touches RechargeOperation never imports the billing stack or numpy.
+_EXPORTS = {
+    # ===============================
+    # Billing
+    # ===============================
+    "PrepaidDailyBilling": ("billing.prepaid_daily", "PrepaidDailyBilling"),
+    "PrepaidDailyBatchBilling": ("billing.prepaid_daily_batch", "PrepaidDailyBatchBilling"),
+    "PrepaidMonthlyInvoice": ("billing.prepaid_monthly", "PrepaidMonthlyInvoice"),
+    "HTBilling": ("billing.ht_billing", "HTBilling"),
 
-# ===============================
-# Accounting
-# ===============================
+    # ===============================
+    # Operations
+    # ===============================
+    "RechargeOperation": ("operations.recharge", "RechargeOperation"),
+    "InstallmentEngine": ("operations.installment", "InstallmentEngine"),
+    "DPSCalculator": ("operations.dps", "DPSCalculator"),
+    "ExcessDemandPenalty": ("operations.excess_demand", "ExcessDemandPenalty"),
 
-from voltengine.accounting.ledger_engine import LedgerEngine
+    # ===============================
+    # Accounting
+    # ===============================
+    "LedgerEngine": ("accounting.ledger_engine", "LedgerEngine"),
 
+    # ===============================
+    # Models
+    # ===============================
+    "Consumer": ("models.consumer", "Consumer"),
+    "Meter": ("models.meter", "Meter"),
+    "Tariff": ("models.tariff", "Tariff"),
+    "Period": ("models.period", "Period"),
+    "BillingPeriod": ("models.period", "Period"),
+}
 
-# ===============================
-# Models (optional public exposure)
-# ===============================
+__all__ = ["__version__"] + list(_EXPORTS)
 
-from voltengine.models.consumer import Consumer
-from voltengine.models.meter import Meter
-from voltengine.models.tariff import Tariff
-from voltengine.models.period import BillingPeriod
 
-__all__ = [
-    # Core
-    "__version__",
+def __getattr__(name):
+    try:
+        module, attr = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name)) from None
 
-    # Billing
-    "PrepaidDailyBilling",
-    "PrepaidMonthlyInvoice",
+    # The tree uses flat imports (billing.*, models.*); when it is imported
+    # as a package from its parent directory, put its own root on the path
+    # so those resolve too
+    root = os.path.dirname(os.path.abspath(__file__))
+    if __package__ and root not in sys.path:
+        sys.path.append(root)
 
-    # Operations
-    "RechargeOperation",
-    "InstallmentEngine",
-    "DPSCalculator",
-    "ExcessDemandPenalty",
+    value = getattr(importlib.import_module(module), attr)
+    globals()[name] = value
+    return value
 
-    # Accounting
-    "LedgerEngine",
 
-    # Models
-    "Consumer",
-    "Meter",
-    "Tariff",
-    "BillingPeriod",
-]
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,296 @@
+import threading
+from collections.abc import Sequence
+
+import numpy as np
+
+from accounting.ledger_index import LedgerIndex
+from accounting.money import round2
+from models.ledger import LEDGER_TYPES
+
+
+class _Interner:
+    def __init__(self, values=()):
+        self.codes = {}
+        self.values = []
+        for value in values:
+            self.code(value)
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def codes_for(self, values):
+        """
+        Codes of many values. Known values resolve through one C-level
+        map over the dict; only ids not seen before are interned, in
+        first-appearance order.
+        """
+        values = values.tolist() if isinstance(values, np.ndarray) else values
+        try:
+            return np.fromiter(map(self.codes.__getitem__, values), dtype=np.int32, count=len(values))
+        except KeyError:
+            pass
+
+        codes = self.codes
+        for value in dict.fromkeys(values):
+            if value not in codes:
+                codes[value] = len(self.values)
+                self.values.append(value)
+        return np.fromiter(map(codes.__getitem__, values), dtype=np.int32, count=len(values))
+
+
+class ColumnarLedgerEngine:
+    """
+    Append-only ledger stored as typed columns instead of one dict per
+    entry. Same record()/snapshot() interface as LedgerEngine.
+
+    Consumer ids, dates and entry types are interned; entry type codes
+    follow models.ledger.LEDGER_TYPES.
+
+    record() and record_batch() are serialised by a lock, so concurrent
+    billing workers can share one ledger. size moves only after a row is
+    fully written, so snapshot() and column() never see a partial row.
+    """
+
+    COLUMNS = (
+        ("consumer", np.int32),
+        ("date", np.int32),
+        ("type", np.int16),
+        ("amount", np.float64),
+        ("balance", np.float64),
+    )
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.consumers = _Interner()
+        self.dates = _Interner()
+        self.types = _Interner(LEDGER_TYPES)
+        self.index = ColumnarLedgerIndex(self)
+        self._lock = threading.Lock()
+
+        self._columns = {
+            name: np.empty(capacity, dtype=dtype)
+            for name, dtype in self.COLUMNS
+        }
+
+    @property
+    def entries(self):
+        return self.snapshot()
+
+    def record(self, date, entry_type, amount, balance, consumer_id=None):
+        with self._lock:
+            self._record(date, entry_type, amount, balance, consumer_id)
+
+    def _record(self, date, entry_type, amount, balance, consumer_id):
+        if self.size == len(self._columns["amount"]):
+            self._grow(self.size + 1)
+
+        i = self.size
+        cols = self._columns
+        cols["consumer"][i] = self.consumers.code(consumer_id)
+        cols["date"][i] = self.dates.code(date)
+        cols["type"][i] = self.types.code(entry_type)
+        cols["amount"][i] = round(amount, 2)
+        cols["balance"][i] = round(balance, 2)
+        self.size += 1
+
+    def record_batch(self, dates, type_codes, amounts, balances, consumer_ids=None):
+        """
+        Append many entries at once. dates / consumer_ids may be a single
+        value (broadcast) or one value per entry; type_codes index
+        LEDGER_TYPES, as produced by PrepaidDailyBatchBilling.ledger_rows.
+        """
+        amounts = round2(amounts)
+        balances = round2(balances)
+        with self._lock:
+            self._record_batch(dates, type_codes, amounts, balances, consumer_ids)
+
+    def _record_batch(self, dates, type_codes, amounts, balances, consumer_ids):
+        n = len(amounts)
+        if self.size + n > len(self._columns["amount"]):
+            self._grow(self.size + n)
+
+        start, stop = self.size, self.size + n
+        cols = self._columns
+        cols["consumer"][start:stop] = self._codes(self.consumers, consumer_ids, n)
+        cols["date"][start:stop] = self._codes(self.dates, dates, n)
+        cols["type"][start:stop] = type_codes
+        cols["amount"][start:stop] = amounts
+        cols["balance"][start:stop] = balances
+        self.size = stop
+
+    def snapshot(self):
+        return LedgerView(self, self.size)
+
+    def column(self, name):
+        """Zero-copy view of one column over the recorded entries."""
+        return self._columns[name][:self.size]
+
+    def totals_by_type(self):
+        sums = np.bincount(
+            self.column("type"),
+            weights=self.column("amount"),
+            minlength=len(self.types.values)
+        )
+        return dict(zip(self.types.values, sums.tolist()))
+
+    def nbytes(self):
+        return sum(col.nbytes for col in self._columns.values())
+
+    @staticmethod
+    def _codes(interner, values, n):
+        if values is None or isinstance(values, (str, int)):
+            return interner.code(values)
+        if not isinstance(values, (list, tuple, np.ndarray)):
+            return interner.code(values)     # e.g. a single date object
+        return interner.codes_for(values)
+
+    def _grow(self, needed):
+        capacity = max(needed, 2 * len(self._columns["amount"]), 16)
+        for name, col in self._columns.items():
+            grown = np.empty(capacity, dtype=col.dtype)
+            grown[:self.size] = col[:self.size]
+            self._columns[name] = grown
+
+
+class ColumnarLedgerIndex:
+    """
+    LedgerIndex queries (total, month_totals) over a columnar ledger.
+
+    Totals are kept as sorted (consumer, month, type) keys with their
+    sums. Recording does no index work; rows recorded since the last
+    query are folded in by the next query with one np.unique and one
+    bincount, never a per-row or per-group Python loop.
+    """
+
+    def __init__(self, ledger):
+        self._ledger = ledger
+        self._folded = 0
+        self._keys = np.empty(0, dtype=np.int64)
+        self._sums = np.empty(0, dtype=np.float64)
+        self.months = _Interner()
+        self._date_month = np.empty(0, dtype=np.int32)    # date code -> month code
+
+    @property
+    def totals(self):
+        """LedgerIndex.totals-style dict, materialised on access."""
+        self._refresh()
+        ledger = self._ledger
+        totals = {}
+        for key, amount in zip(self._keys.tolist(), self._sums.tolist()):
+            month = totals.setdefault(
+                (ledger.consumers.values[key >> 32], self.months.values[(key >> 16) & 0xFFFF]), {})
+            month[ledger.types.values[key & 0xFFFF]] = amount
+        return totals
+
+    def total(self, consumer_id, month, entry_type):
+        return self.month_totals(consumer_id, month).get(entry_type, 0)
+
+    def month_totals(self, consumer_id, month):
+        self._refresh()
+        consumer = self._ledger.consumers.codes.get(consumer_id)
+        month = self.months.codes.get(month)
+        if consumer is None or month is None:
+            return {}
+
+        lo = (consumer << 32) | (month << 16)
+        i, j = np.searchsorted(self._keys, [lo, lo + (1 << 16)])
+        types = self._ledger.types.values
+        return {
+            types[key & 0xFFFF]: amount
+            for key, amount in zip(self._keys[i:j].tolist(), self._sums[i:j].tolist())
+        }
+
+    def _refresh(self):
+        with self._ledger._lock:
+            self._fold()
+
+    def _fold(self):
+        ledger = self._ledger
+        start, stop = self._folded, ledger.size
+        if start == stop:
+            return
+
+        cols = ledger._columns
+        keys = (
+            (cols["consumer"][start:stop].astype(np.int64) << 32)
+            | (self._month_codes(cols["date"][start:stop]).astype(np.int64) << 16)
+            | cols["type"][start:stop].astype(np.int64)
+        )
+        # Existing sums come first, so every total keeps the record order
+        self._keys, inverse = np.unique(
+            np.concatenate([self._keys, keys]), return_inverse=True)
+        self._sums = np.bincount(
+            inverse.ravel(), weights=np.concatenate([self._sums, cols["amount"][start:stop]]))
+        self._folded = stop
+
+    def _month_codes(self, date_codes):
+        dates = self._ledger.dates.values
+        known = len(self._date_month)
+        if known < len(dates):
+            months = [self.months.code(LedgerIndex.month_of(d)) for d in dates[known:]]
+            self._date_month = np.concatenate(
+                [self._date_month, np.array(months, dtype=np.int32)])
+        return self._date_month[date_codes]
+
+
+class LedgerView(Sequence):
+    """
+    Lazy, read-only view over the first `size` entries of a columnar
+    ledger. Items are built as LedgerEntry.as_dict()-style dicts on access;
+    to_columns() / column() give the same entries as arrays without
+    building a dict per entry.
+    """
+
+    def __init__(self, ledger, size):
+        self._ledger = ledger
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._size))]
+
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("ledger index out of range")
+
+        ledger = self._ledger
+        cols = ledger._columns
+        return {
+            "date": ledger.dates.values[cols["date"][i]],
+            "type": ledger.types.values[cols["type"][i]],
+            "amount": float(cols["amount"][i]),
+            "balance": float(cols["balance"][i])
+        }
+
+    def __iter__(self):
+        ledger = self._ledger
+        dates, types = ledger.dates.values, ledger.types.values
+        for date, entry_type, amount, balance in zip(
+            *(self.column(name).tolist() for name in ("date", "type", "amount", "balance"))
+        ):
+            yield {"date": dates[date], "type": types[entry_type], "amount": amount, "balance": balance}
+
+    def column(self, name):
+        return self._ledger._columns[name][:self._size]
+
+    def to_columns(self):
+        """
+        Decoded columns: consumerId / date / type as object arrays (one
+        lookup per distinct value), amount / balance as zero-copy views.
+        """
+        ledger = self._ledger
+        return {
+            "consumerId": np.array(ledger.consumers.values, dtype=object)[self.column("consumer")],
+            "date": np.array(ledger.dates.values, dtype=object)[self.column("date")],
+            "type": np.array(ledger.types.values, dtype=object)[self.column("type")],
+            "amount": self.column("amount"),
+            "balance": self.column("balance"),
+        }
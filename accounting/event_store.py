@@ -0,0 +1,294 @@
+import json
+import os
+
+from billing.prepaid_daily import PrepaidDailyBilling
+from models.consumer import Consumer
+from models.meter import Meter
+from models.period import Period
+from operations.load_change import LoadChange
+from operations.recharge import RechargeOperation
+
+
+OPENED = "CONSUMER_OPENED"
+RECHARGE = "RECHARGE"
+DAILY_BILL = "DAILY_BILL"
+LOAD_CHANGE = "LOAD_CHANGE"
+TARIFF_CHANGE = "TARIFF_CHANGE"
+
+
+class _NullLedger:
+    def record(self, *args, **kwargs):
+        pass
+
+
+class _BufferedLedger:
+    """Holds ledger records until the event that produced them is logged."""
+
+    def __init__(self):
+        self.records = []
+
+    def record(self, *args, **kwargs):
+        self.records.append((args, kwargs))
+
+    def replay(self, ledger):
+        for args, kwargs in self.records:
+            ledger.record(*args, **kwargs)
+
+
+class ConsumerEventStore:
+    """
+    Event-sourced consumer state.
+
+    Every state change is appended to the log as an event and then
+    applied through the same operation the live path uses
+    (RechargeOperation, PrepaidDailyBilling, LoadChange), so a replay
+    reproduces the live balances exactly.
+
+    tariffs        : mapping tariff key -> Tariff
+    path           : optional JSON-lines event log; checkpoints go to
+                     path + ".snapshot" and record the log offset, so a
+                     restore reads the snapshot plus the tail only
+    snapshot_every : checkpoint automatically after this many events
+    fsync          : every event is flushed to the OS before its result is
+                     returned, so it survives a process crash; fsync=True
+                     also forces it to disk (survives power loss)
+
+    An event is applied to a copy of the consumer first and only logged,
+    and made live, once that succeeds, so the log never holds an event
+    that fails on replay.
+    """
+
+    def __init__(self, tariffs, path=None, snapshot_every=None, fsync=False):
+        self.tariffs = tariffs
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+
+        self.consumers = {}         # consumer_id -> Consumer (live state)
+        self.tariff_of = {}         # consumer_id -> tariff key
+        self.seq = 0
+        self.tail = []              # events since the last snapshot
+        self.snapshot_state = {}    # consumer_id -> compact state at snapshot_seq
+        self.snapshot_seq = 0
+
+        self._biller = PrepaidDailyBilling()
+        self._log = open(path, "a", encoding="utf-8") if path else None
+
+    # -----------------------------
+    # Commands
+    # -----------------------------
+    def open_account(self, consumer, tariff_key, date=None):
+        return self.append(OPENED, consumer.consumer_id, date, {
+            "state": self._compact(consumer, tariff_key)
+        })
+
+    def recharge(self, consumer_id, amount, date=None, revise_installment=True):
+        return self.append(RECHARGE, consumer_id, date, {
+            "amount": amount,
+            "reviseInstallment": revise_installment
+        })
+
+    def bill_daily(self, consumer_id, daily_units, max_demand_kw, date, period_days=30, ledger=None):
+        return self.append(DAILY_BILL, consumer_id, date, {
+            "dailyUnits": daily_units,
+            "maxDemandKw": max_demand_kw,
+            "periodDays": period_days
+        }, ledger)
+
+    def change_load(self, consumer_id, new_load_kw, date=None):
+        return self.append(LOAD_CHANGE, consumer_id, date, {"newLoadKw": new_load_kw})
+
+    def change_tariff(self, consumer_id, tariff_key, date=None):
+        return self.append(TARIFF_CHANGE, consumer_id, date, {"tariff": tariff_key})
+
+    def append(self, event_type, consumer_id, date, payload, ledger=None):
+        self._validate(event_type, consumer_id, payload)
+
+        event = {
+            "seq": self.seq + 1,
+            "type": event_type,
+            "consumerId": consumer_id,
+            "date": date,
+            "payload": payload
+        }
+        line = json.dumps(event, separators=(",", ":")) + "\n"
+
+        # Apply to a copy first: a rejected event must never reach the log,
+        # or every later restore() replays it and fails the same way
+        consumers, tariff_of = {}, {}
+        if consumer_id in self.consumers:
+            consumers[consumer_id], tariff_of[consumer_id] = self._expand(
+                consumer_id, self._compact(self.consumers[consumer_id], self.tariff_of[consumer_id]))
+        buffered = _BufferedLedger() if ledger is not None else None
+        result = self.apply(event, consumers, tariff_of, buffered)
+
+        self.seq += 1
+        if self._log is not None:
+            self._log.write(line)
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+        self.tail.append(event)
+
+        self.consumers[consumer_id] = consumers[consumer_id]
+        self.tariff_of[consumer_id] = tariff_of[consumer_id]
+        if buffered is not None:
+            buffered.replay(ledger)
+
+        if self.snapshot_every and len(self.tail) >= self.snapshot_every:
+            self.checkpoint()
+        return result
+
+    def _validate(self, event_type, consumer_id, payload):
+        if event_type == OPENED:
+            tariff_key = payload["state"][4]
+        else:
+            if consumer_id not in self.consumers:
+                raise KeyError("Unknown consumer %r" % (consumer_id,))
+            tariff_key = payload.get("tariff") if event_type == TARIFF_CHANGE else None
+
+        if event_type in (OPENED, TARIFF_CHANGE) and tariff_key not in self.tariffs:
+            raise KeyError("Unknown tariff %r" % (tariff_key,))
+
+    # -----------------------------
+    # Replay
+    # -----------------------------
+    def apply(self, event, consumers, tariff_of, ledger=None):
+        cid = event["consumerId"]
+        payload = event["payload"]
+        kind = event["type"]
+
+        if kind == OPENED:
+            consumers[cid], tariff_of[cid] = self._expand(cid, payload["state"])
+            return None
+
+        consumer = consumers[cid]
+        if kind == RECHARGE:
+            return RechargeOperation.apply(
+                consumer, payload["amount"], payload["reviseInstallment"])
+        if kind == DAILY_BILL:
+            return self._biller.run(
+                consumer,
+                Meter(payload["dailyUnits"], payload["maxDemandKw"]),
+                self.tariffs[tariff_of[cid]],
+                Period(payload["periodDays"]),
+                ledger if ledger is not None else _NullLedger(),
+                event["date"]
+            )
+        if kind == LOAD_CHANGE:
+            return LoadChange.apply(consumer, payload["newLoadKw"])
+        if kind == TARIFF_CHANGE:
+            old = tariff_of[cid]
+            tariff_of[cid] = payload["tariff"]
+            return {"oldTariff": old, "newTariff": payload["tariff"]}
+
+        raise ValueError("Unknown event type %r" % (kind,))
+
+    def rebuild(self, consumer_id=None, ledger=None):
+        """
+        Rebuild one consumer (or the fleet) from the latest snapshot plus
+        the event tail. Returns (consumers, tariff_of); pass a ledger to
+        recompute the tail's ledger entries, e.g. for a dispute.
+        """
+        consumers, tariff_of = {}, {}
+        for cid, state in self.snapshot_state.items():
+            if consumer_id is None or cid == consumer_id:
+                consumers[cid], tariff_of[cid] = self._expand(cid, state)
+
+        for event in self.tail:
+            if consumer_id is None or event["consumerId"] == consumer_id:
+                self.apply(event, consumers, tariff_of, ledger)
+
+        return consumers, tariff_of
+
+    # -----------------------------
+    # Snapshots
+    # -----------------------------
+    def checkpoint(self):
+        self.snapshot_state = {
+            cid: self._compact(c, self.tariff_of[cid]) for cid, c in self.consumers.items()
+        }
+        self.snapshot_seq = self.seq
+        self.tail = []
+
+        if self.path is not None:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+
+            target = self.path + ".snapshot"
+            with open(target + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({
+                    "seq": self.seq,
+                    "logOffset": self._log.tell(),
+                    "consumers": self.snapshot_state
+                }, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(target + ".tmp", target)
+
+    @classmethod
+    def restore(cls, path, tariffs, snapshot_every=None, fsync=False):
+        """Latest snapshot plus the log tail after it."""
+        store = cls(tariffs, snapshot_every=snapshot_every, fsync=fsync)
+
+        offset = 0
+        snapshot = path + ".snapshot"
+        if os.path.exists(snapshot):
+            with open(snapshot, encoding="utf-8") as f:
+                data = json.load(f)
+            store.snapshot_state = data["consumers"]
+            store.snapshot_seq = store.seq = data["seq"]
+            offset = data["logOffset"]
+            for cid, state in store.snapshot_state.items():
+                store.consumers[cid], store.tariff_of[cid] = store._expand(cid, state)
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith("\n"):
+                        break           # torn final write
+                    event = json.loads(line)
+                    store.seq = event["seq"]
+                    store.tail.append(event)
+                    store.apply(event, store.consumers, store.tariff_of)
+
+            # Drop a torn tail so new events start on a clean line
+            with open(path, "r+b") as f:
+                f.seek(0, os.SEEK_END)
+                end = f.tell()
+                f.seek(offset)
+                good = offset + sum(len(line) for line in f if line.endswith(b"\n"))
+                if good != end:
+                    f.truncate(good)
+
+        store.path = path
+        store._log = open(path, "a", encoding="utf-8")
+        return store
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _compact(consumer, tariff_key):
+        return [
+            consumer.wallet_balance,
+            consumer.arrear_balance,
+            consumer.load_kw,
+            dict(consumer.installment) if consumer.installment is not None else None,
+            tariff_key
+        ]
+
+    @staticmethod
+    def _expand(consumer_id, state):
+        wallet, arrear, load_kw, installment, tariff_key = state
+        installment = dict(installment) if installment is not None else None
+        return Consumer(consumer_id, wallet, arrear, load_kw, installment), tariff_key
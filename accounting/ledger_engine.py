@@ -1,13 +1,17 @@
+from accounting.ledger_index import LedgerIndex
 from models.ledger import LedgerEntry
 
 class LedgerEngine:
 
     def __init__(self):
         self.entries = []
+        self.index = LedgerIndex()
 
-    def record(self, date, entry_type, amount, balance):
+    def record(self, date, entry_type, amount, balance, consumer_id=None):
         entry = LedgerEntry(date, entry_type, amount, balance)
-        self.entries.append(entry.as_dict())
+        row = entry.as_dict()
+        self.entries.append(row)
+        self.index.add(consumer_id, date, entry_type, row["amount"])
 
     def snapshot(self):
         return self.entries
@@ -0,0 +1,24 @@
+class LedgerIndex:
+    """
+    Running totals keyed by (consumer, month, entry type), kept up to
+    date on every ledger record so monthly reports are a lookup.
+    """
+
+    def __init__(self):
+        self.totals = {}    # (consumer_id, "YYYY-MM") -> {entry_type: amount}
+
+    @staticmethod
+    def month_of(date):
+        if isinstance(date, str):
+            return date[:7]
+        return date.strftime("%Y-%m")
+
+    def add(self, consumer_id, date, entry_type, amount):
+        month = self.totals.setdefault((consumer_id, self.month_of(date)), {})
+        month[entry_type] = month.get(entry_type, 0) + amount
+
+    def total(self, consumer_id, month, entry_type):
+        return self.totals.get((consumer_id, month), {}).get(entry_type, 0)
+
+    def month_totals(self, consumer_id, month):
+        return dict(self.totals.get((consumer_id, month), {}))
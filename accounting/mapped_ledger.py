@@ -0,0 +1,367 @@
+import datetime
+import json
+import os
+
+import numpy as np
+
+from accounting.ledger_index import LedgerIndex
+from accounting.money import round2
+from models.ledger import LEDGER_TYPES
+
+
+# One fixed-width (32 byte) little-endian record per ledger entry.
+# date is YYYYMMDD; consumer is a code into the store's consumer list
+# (-1 for entries recorded without a consumer id).
+RECORD = np.dtype([
+    ("consumer", "<i4"),
+    ("date", "<i4"),
+    ("type", "<i2"),
+    ("amount", "<f8"),
+    ("balance", "<f8"),
+], align=True)
+
+_TYPE_CODES = {name: code for code, name in enumerate(LEDGER_TYPES)}
+
+
+def date_code(date):
+    if isinstance(date, str):
+        return int(date[:10].replace("-", ""))
+    return date.year * 10000 + date.month * 100 + date.day
+
+
+def date_of(code):
+    return "%04d-%02d-%02d" % (code // 10000, code // 100 % 100, code % 100)
+
+
+class MappedLedgerStore:
+    """
+    Persistent append-only ledger in fixed-width binary segment files.
+
+    directory/
+        meta.json            committed record count and segment size
+        consumers.txt        consumer id per code, one per line
+        seg-000000.bin       segment_records x RECORD, memory-mapped
+        seg-000000.keys.npy  sealed segments: (consumer, start, stop) rows
+        seg-000000.order.npy sealed segments: local offsets grouped by consumer
+
+    record()/record_batch() buffer in memory and append on flush(), which
+    runs every flush_every entries and on close(). Reads (statement,
+    month_totals, segments) are numpy views over the mapping, so a report
+    touches only the pages it needs instead of loading the ledger.
+
+    month_totals() matches LedgerIndex, so the store can be passed as
+    PrepaidMonthlyInvoice.generate(..., index=store).
+    """
+
+    def __init__(self, directory, segment_records=1 << 20, flush_every=65536):
+        self.directory = directory
+        self.flush_every = flush_every
+        os.makedirs(directory, exist_ok=True)
+
+        meta = self._read_meta()
+        self.segment_records = meta.get("segmentRecords", segment_records)
+        self.size = meta.get("records", 0)
+
+        self.consumer_ids = []
+        self.consumer_codes = {}
+        path = self._path("consumers.txt")
+        if os.path.exists(path):
+            with open(path, "r+b") as f:
+                committed = f.read().split(b"\n")[:meta.get("consumers", 0)]
+                for line in committed:
+                    self._intern(json.loads(line))
+                # Ids written by a flush that crashed before meta.json are
+                # not committed; drop them so new ids get the right codes
+                f.seek(sum(len(line) + 1 for line in committed))
+                f.truncate()
+        self._consumers_saved = len(self.consumer_ids)
+        self.closed = False
+
+        self._buffer = []
+        self._buffered = 0
+        self._sealed = {}       # segment -> (keys, order)
+        self._maps = {}         # sealed segment -> read-only memmap
+        self._active = None     # writable memmap of the last segment
+        self._active_index = {}  # consumer code -> [local offsets]
+        self._open_active()
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def record(self, date, entry_type, amount, balance, consumer_id=None):
+        self._check_open()
+        self._buffer.append((
+            self._intern(consumer_id),
+            date_code(date),
+            _TYPE_CODES[entry_type],
+            round(amount, 2),
+            round(balance, 2)
+        ))
+        self._buffered += 1
+        if self._buffered >= self.flush_every:
+            self.flush()
+
+    def record_batch(self, dates, type_codes, amounts, balances, consumer_ids=None):
+        """Same arguments as ColumnarLedgerEngine.record_batch."""
+        self._check_open()
+        amounts = round2(amounts)
+        n = len(amounts)
+
+        rows = np.empty(n, dtype=RECORD)
+        rows["consumer"] = self._codes(consumer_ids, n, self._intern)
+        rows["date"] = self._codes(dates, n, date_code)
+        rows["type"] = type_codes
+        rows["amount"] = amounts
+        rows["balance"] = round2(balances)
+
+        self._buffer.append(rows)
+        self._buffered += n
+        if self._buffered >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._buffered:
+            return
+
+        rows = np.concatenate(list(self._merge_tuples(self._buffer)))
+        self._buffer, self._buffered = [], 0
+
+        # Consumer ids first, so committed records never point past the list
+        if len(self.consumer_ids) > self._consumers_saved:
+            with open(self._path("consumers.txt"), "a", encoding="utf-8") as f:
+                for cid in self.consumer_ids[self._consumers_saved:]:
+                    f.write(json.dumps(cid) + "\n")
+            self._consumers_saved = len(self.consumer_ids)
+
+        done = 0
+        while done < len(rows):
+            local = self.size % self.segment_records
+            take = min(len(rows) - done, self.segment_records - local)
+            chunk = rows[done:done + take]
+
+            self._active[local:local + take] = chunk
+            for code, offset in zip(chunk["consumer"].tolist(), range(local, local + take)):
+                self._active_index.setdefault(code, []).append(offset)
+
+            self.size += take
+            done += take
+            if self.size % self.segment_records == 0:
+                self._seal()
+
+        if self._active is not None:
+            self._active.flush()
+        self._write_meta()
+
+    def close(self):
+        """Flush and stop accepting writes; committed records stay readable."""
+        if not self.closed:
+            self.flush()
+            self.closed = True
+
+    def _check_open(self):
+        if self.closed:
+            raise ValueError("Ledger store %r is closed" % (self.directory,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def __len__(self):
+        return self.size + self._buffered
+
+    def segments(self):
+        """Read-only record views over each segment's committed entries."""
+        for seg in range(self._segment_count()):
+            count = min(self.segment_records, self.size - seg * self.segment_records)
+            if count > 0:
+                yield self._map(seg, count)
+
+    def column(self, name):
+        """One column across all segments (a copy; prefer segments() for scans)."""
+        parts = [seg[name] for seg in self.segments()]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=RECORD[name])
+
+    def statement(self, consumer_id, month=None):
+        """
+        Committed records of one consumer in posting order, optionally
+        limited to a "YYYY-MM" month.
+        """
+        code = self.consumer_codes.get(consumer_id)
+        if code is None:
+            return np.empty(0, dtype=RECORD)
+
+        parts = []
+        for seg in range(self._segment_count()):
+            offsets = self._offsets(seg, code)
+            if len(offsets):
+                parts.append(self._map(seg)[offsets])
+        rows = np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+
+        if month is not None:
+            rows = rows[rows["date"] // 100 == int(month.replace("-", ""))]
+        return rows
+
+    def entries(self, consumer_id, month=None):
+        """statement() as LedgerEntry.as_dict()-style dicts."""
+        rows = self.statement(consumer_id, month)
+        return [
+            {"date": date_of(d), "type": LEDGER_TYPES[t], "amount": a, "balance": b}
+            for d, t, a, b in zip(rows["date"].tolist(), rows["type"].tolist(),
+                                  rows["amount"].tolist(), rows["balance"].tolist())
+        ]
+
+    def month_totals(self, consumer_id, month):
+        rows = self.statement(consumer_id, month)
+        sums = np.bincount(rows["type"], weights=rows["amount"], minlength=len(LEDGER_TYPES))
+        present = np.bincount(rows["type"], minlength=len(LEDGER_TYPES)) > 0
+        return {
+            LEDGER_TYPES[t]: total
+            for t, total in enumerate(sums.tolist()) if present[t]
+        }
+
+    def total(self, consumer_id, month, entry_type):
+        return self.month_totals(consumer_id, month).get(entry_type, 0)
+
+    def totals_by_type(self):
+        sums = np.zeros(len(LEDGER_TYPES))
+        for seg in self.segments():
+            sums += np.bincount(seg["type"], weights=seg["amount"], minlength=len(LEDGER_TYPES))
+        return dict(zip(LEDGER_TYPES, sums.tolist()))
+
+    def build_index(self):
+        """Rebuild an in-memory LedgerIndex from the store."""
+        index = LedgerIndex()
+        for seg in self.segments():
+            for c, d, t, a in zip(seg["consumer"].tolist(), seg["date"].tolist(),
+                                  seg["type"].tolist(), seg["amount"].tolist()):
+                cid = self.consumer_ids[c] if c >= 0 else None
+                index.add(cid, date_of(d), LEDGER_TYPES[t], a)
+        return index
+
+    # -----------------------------
+    # Segments
+    # -----------------------------
+    def _segment_count(self):
+        return -(-self.size // self.segment_records) if self.size else 0
+
+    def _segment_path(self, seg, suffix="bin"):
+        return self._path("seg-%06d.%s" % (seg, suffix))
+
+    def _map(self, seg, count=None):
+        if count is None:
+            count = min(self.segment_records, self.size - seg * self.segment_records)
+        if self._active is not None and seg == self.size // self.segment_records:
+            return self._active[:count]
+
+        mapped = self._maps.get(seg)
+        if mapped is None:
+            mapped = self._maps[seg] = np.memmap(
+                self._segment_path(seg), dtype=RECORD, mode="r",
+                shape=(self.segment_records,))
+        return mapped[:count]
+
+    def _offsets(self, seg, code):
+        if self._active is not None and seg == self.size // self.segment_records:
+            return np.asarray(self._active_index.get(code, ()), dtype=np.intp)
+
+        keys, order = self._sealed_index(seg)
+        i = np.searchsorted(keys[:, 0], code)
+        if i == len(keys) or keys[i, 0] != code:
+            return np.empty(0, dtype=np.intp)
+        return order[keys[i, 1]:keys[i, 2]]
+
+    def _sealed_index(self, seg):
+        index = self._sealed.get(seg)
+        if index is None:
+            keys = np.load(self._segment_path(seg, "keys.npy"))
+            order = np.load(self._segment_path(seg, "order.npy"), mmap_mode="r")
+            index = self._sealed[seg] = (keys, order)
+        return index
+
+    def _seal(self):
+        """Persist the per-consumer index of the segment that just filled."""
+        seg = self.size // self.segment_records - 1
+        consumers = np.asarray(self._active["consumer"])
+
+        order = np.argsort(consumers, kind="stable").astype(np.uint32)
+        codes, starts = np.unique(consumers[order], return_index=True)
+        stops = np.append(starts[1:], len(order))
+        keys = np.stack([codes, starts, stops], axis=1).astype(np.int64)
+
+        self._active.flush()
+        np.save(self._segment_path(seg, "order.npy"), order)
+        np.save(self._segment_path(seg, "keys.npy"), keys)
+
+        self._active = None
+        self._open_active()
+
+    def _open_active(self):
+        seg = self.size // self.segment_records
+        path = self._segment_path(seg)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.truncate(self.segment_records * RECORD.itemsize)
+
+        self._active = np.memmap(path, dtype=RECORD, mode="r+", shape=(self.segment_records,))
+        self._active_index = {}
+        local = self.size % self.segment_records
+        for offset, code in enumerate(self._active["consumer"][:local].tolist()):
+            self._active_index.setdefault(code, []).append(offset)
+
+    # -----------------------------
+    # Helpers
+    # -----------------------------
+    def _intern(self, consumer_id):
+        if consumer_id is None:
+            return -1
+        code = self.consumer_codes.get(consumer_id)
+        if code is None:
+            code = self.consumer_codes[consumer_id] = len(self.consumer_ids)
+            self.consumer_ids.append(consumer_id)
+        return code
+
+    @staticmethod
+    def _codes(values, n, encode):
+        if values is None or isinstance(values, (str, int, datetime.date)):
+            return encode(values)
+        return np.fromiter((encode(v) for v in values), dtype=np.int32, count=n)
+
+    @staticmethod
+    def _merge_tuples(buffer):
+        # Group runs of single record() tuples into one array each
+        run = []
+        for part in buffer:
+            if isinstance(part, tuple):
+                run.append(part)
+                continue
+            if run:
+                yield np.array(run, dtype=RECORD)
+                run = []
+            yield part
+        if run:
+            yield np.array(run, dtype=RECORD)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_meta(self):
+        path = self._path("meta.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_meta(self):
+        path = self._path("meta.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "records": self.size,
+                "segmentRecords": self.segment_records,
+                "consumers": self._consumers_saved
+            }, f)
+        os.replace(path + ".tmp", path)
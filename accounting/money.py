@@ -0,0 +1,48 @@
+import math
+
+from engine.lazy import LazyModule
+
+np = LazyModule("numpy")
+
+
+# -----------------------------
+# Fixed-point money (int paise)
+# -----------------------------
+#
+# Amounts are posted as whole paise, rounded half up:
+# floor(rupees * 100 + 0.5). The same two IEEE operations are used by
+# the scalar and the array form, so scalar and batch engines post
+# bit-identical amounts. Balances are carried as paise / 100, which
+# round-trips exactly through to_paise.
+
+def to_paise(rupees):
+    return math.floor(rupees * 100 + 0.5)
+
+
+def to_paise_array(rupees):
+    return np.floor(np.asarray(rupees, dtype=np.float64) * 100 + 0.5).astype(np.int64)
+
+
+def from_paise(paise):
+    return paise / 100
+
+
+def round_money(rupees):
+    """Scalar rupees rounded to the paisa by the posting rule."""
+    return math.floor(rupees * 100 + 0.5) / 100
+
+
+def round2(values):
+    """
+    Vectorised round(x, 2) that agrees with Python's round().
+    np.round scales by 100 first, which can flip exact half-paisa ties.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, 2)
+
+    frac = np.abs(values * 100) % 1
+    ties = np.flatnonzero(np.abs(frac - 0.5) < 1e-6)
+    for i in ties:
+        rounded.flat[i] = round(float(values.flat[i]), 2)
+
+    return rounded
@@ -5,7 +5,7 @@
 Single entry point for frontend / external systems.
 
 Usage:
-    from  .api import  API
+    from api import API
 """
 
 # ===============================
@@ -19,40 +19,48 @@ from billing.prepaid_monthly import PrepaidMonthlyInvoice
 # Operations
 # ===============================
 
-from  .operations.recharge import RechargeOperation
-from  .operations.installment import InstallmentEngine
-from  .operations.dps import DPSCalculator
-from  .operations.excess_demand import ExcessDemandPenalty
-from  .operations.load_change import LoadChange
-from  operations.wallet import WalletService
+from operations.recharge import RechargeOperation
+from operations.installment import InstallmentEngine
+from operations.dps import DPSCalculator
+from operations.excess_demand import ExcessDemandPenalty
+from operations.load_change import LoadChange
+from operations.wallet import WalletService
 
 # slab tariff helper (important — your new path)
-from  operations.slab_tariff import SlabTariffCalculator
+from operations.slab_tariff import SlabTariffCalculator
 
 # ===============================
-
 # Accounting
 # ===============================
 
-from  .accounting.ledger_engine import LedgerEngine
+from accounting.ledger_engine import LedgerEngine
 
 # ===============================
 # Models
 # ===============================
 
-from  .models.consumer import Consumer
-from  .models.meter import Meter
-from  .models.tariff import Tariff
-from  .models.period import Period
+from models.consumer import Consumer
+from models.meter import Meter
+from models.tariff import Tariff
+from models.period import Period
+
+# ===============================
+# Vectorised engines (numpy), imported on first use
+# ===============================
+
+from engine.lazy import LazyModule
+
+prepaid_daily_batch = LazyModule("billing.prepaid_daily_batch")
+proration = LazyModule("tariff.proration")
 
 
 # =====================================================
 # 🚀 MAIN FACADE CLASS (Frontend will use this)
 # =====================================================
 
-class  API:
+class API:
     """
-    Unified facade for  .
+    Unified facade over the billing engines.
     Frontend should ONLY talk to this class.
     """
 
@@ -60,52 +68,83 @@ class  API:
     # DAILY BILL
     # -----------------------------
     @staticmethod
-    def run_daily_billing(context: dict):
-        engine = PrepaidDailyBilling()
-        return engine.calculate(context)
+    def run_daily_billing(consumer, meter, tariff, period, ledger, date, settlement=None):
+        return PrepaidDailyBilling().run(
+            consumer, meter, tariff, period, ledger, date, settlement
+        )
+
+    @staticmethod
+    def run_daily_billing_batch(tariffs, period, **columns):
+        biller = prepaid_daily_batch.PrepaidDailyBatchBilling(tariffs)
+        result = biller.run(period=period, **columns)
+        return result, biller.ledger_rows(result)
 
     # -----------------------------
     # MONTHLY BILL
     # -----------------------------
     @staticmethod
-    def run_monthly_invoice(context: dict):
-        engine = PrepaidMonthlyInvoice()
-        return engine.generate(context)
+    def run_monthly_invoice(consumer, ledger_entries, month, index=None):
+        return PrepaidMonthlyInvoice().generate(
+            consumer, ledger_entries, month, index
+        )
 
     # -----------------------------
     # RECHARGE
     # -----------------------------
     @staticmethod
-    def recharge(context: dict):
-        return RechargeOperation().execute(context)
+    def recharge(consumer, amount, revise_installment=True):
+        return RechargeOperation.apply(consumer, amount, revise_installment)
 
     # -----------------------------
     # DPS
     # -----------------------------
     @staticmethod
-    def calculate_dps(context: dict):
-        return DPSCalculator().calculate(context)
+    def calculate_dps(arrear, monthly_rate):
+        return DPSCalculator.daily(arrear, monthly_rate)
 
     # -----------------------------
     # INSTALLMENT
     # -----------------------------
     @staticmethod
-    def recover_installment(context: dict):
-        return InstallmentEngine().recover(context)
+    def recover_installment(arrear_balance, tenure_days=180):
+        return InstallmentEngine.revise(arrear_balance, tenure_days)
 
     # -----------------------------
     # EXCESS DEMAND
     # -----------------------------
     @staticmethod
-    def excess_demand(context: dict):
-        return ExcessDemandPenalty().calculate(context)
+    def excess_demand(recorded_demand, contract_demand, demand_rate, multiplier):
+        return ExcessDemandPenalty.calculate(
+            recorded_demand, contract_demand, demand_rate, multiplier
+        )
+
+    # -----------------------------
+    # LOAD CHANGE
+    # -----------------------------
+    @staticmethod
+    def change_load(consumer, new_load_kw):
+        return LoadChange.apply(consumer, new_load_kw)
+
+    # -----------------------------
+    # SLAB TARIFF
+    # -----------------------------
+    @staticmethod
+    def slab_energy(units, slabs):
+        return SlabTariffCalculator().calculate(units, slabs)
+
+    # -----------------------------
+    # TARIFF CHANGE (mid-cycle proration)
+    # -----------------------------
+    @staticmethod
+    def prorate_tariff_change(units, old_tariff, new_tariff, days, change_day):
+        return proration.TariffProration.prorate(units, old_tariff, new_tariff, days, change_day)
 
     # -----------------------------
     # LEDGER
     # -----------------------------
     @staticmethod
-    def build_ledger(context: dict):
-        return LedgerEngine().post_entries(context)
+    def build_ledger():
+        return LedgerEngine()
 
 
 # =====================================================
@@ -113,9 +152,10 @@ class  API:
 # =====================================================
 
 __all__ = [
-    " API",
+    "API",
     "Consumer",
     "Meter",
     "Tariff",
     "Period",
+    "WalletService",
 ]
@@ -0,0 +1,94 @@
+import numpy as np
+
+from models.consumer import Consumer
+from models.meter import Meter
+from models.tariff import Tariff
+from models.period import Period
+
+
+class SyntheticFleet:
+    """
+    Reproducible synthetic prepaid fleet for benchmarks.
+
+    consumers        : fleet size
+    slabs            : slabs per tariff (last one unbounded)
+    tariffs          : number of distinct tariffs
+    arrear_share     : fraction of consumers carrying an arrear
+    installment_share: fraction of arrear holders on an installment plan
+    """
+
+    def __init__(
+        self,
+        consumers=10_000,
+        slabs=3,
+        tariffs=4,
+        arrear_share=0.3,
+        installment_share=0.7,
+        seed=42
+    ):
+        rng = np.random.default_rng(seed)
+        n = consumers
+
+        self.period = Period(30)
+        self.tariffs = [self._tariff(rng, slabs) for _ in range(tariffs)]
+
+        has_arrear = rng.random(n) < arrear_share
+        on_plan = has_arrear & (rng.random(n) < installment_share)
+
+        self.ids = ["PRE-%07d" % i for i in range(n)]
+        self.tariff_ids = rng.integers(0, tariffs, n)
+        self.wallet_balance = rng.uniform(-200, 3000, n).round(2)
+        self.arrear_balance = np.where(has_arrear, rng.uniform(100, 20000, n), 0.0).round(2)
+        self.load_kw = rng.choice([1.0, 2.0, 3.0, 5.0, 10.0], n)
+        self.installment_daily = np.where(
+            on_plan, (self.arrear_balance / 180).round(2), 0.0)
+        self.daily_units = rng.gamma(2.0, 4.0, n).round(2)
+        self.max_demand_kw = (self.load_kw * rng.uniform(0.3, 1.4, n)).round(2)
+
+    @staticmethod
+    def _tariff(rng, slabs):
+        widths = rng.choice([50, 100, 150, 200], slabs - 1).tolist() + [None]
+        rates = np.sort(rng.uniform(2.5, 9.0, slabs)).round(2).tolist()
+        return Tariff(
+            [{"upto": w, "rate": r} for w, r in zip(widths, rates)],
+            fixed_charge=float(rng.choice([90, 120, 250])),
+            duty_rate=float(rng.choice([0.05, 0.08])),
+            demand_rate=float(rng.choice([0, 250, 400]))
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def consumers(self):
+        return [
+            Consumer(
+                cid, w, a, l,
+                {"total": a, "daily": d, "tenureDays": 180} if d > 0 else None
+            )
+            for cid, w, a, l, d in zip(
+                self.ids,
+                self.wallet_balance.tolist(),
+                self.arrear_balance.tolist(),
+                self.load_kw.tolist(),
+                self.installment_daily.tolist()
+            )
+        ]
+
+    def meters(self):
+        return [
+            Meter(u, md)
+            for u, md in zip(self.daily_units.tolist(), self.max_demand_kw.tolist())
+        ]
+
+    def columns(self):
+        """Keyword arguments for PrepaidDailyBatchBilling.run."""
+        return {
+            "wallet_balance": self.wallet_balance,
+            "arrear_balance": self.arrear_balance,
+            "load_kw": self.load_kw,
+            "installment_daily": self.installment_daily,
+            "daily_units": self.daily_units,
+            "max_demand_kw": self.max_demand_kw,
+            "tariff_ids": self.tariff_ids,
+            "period": self.period,
+        }
@@ -0,0 +1,60 @@
+import time
+import tracemalloc
+
+
+class BenchResult:
+    def __init__(self, name, items, samples_ns, peak_bytes):
+        self.name = name
+        self.items = items                  # items processed per call
+        self.samples_ns = sorted(samples_ns)
+        self.peak_bytes = peak_bytes
+
+    def percentile(self, p):
+        s = self.samples_ns
+        return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+    @property
+    def throughput(self):
+        """Items per second at the median latency."""
+        return self.items / (self.percentile(50) / 1e9)
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "items": self.items,
+            "calls": len(self.samples_ns),
+            "throughputPerSec": round(self.throughput, 1),
+            "p50Ms": round(self.percentile(50) / 1e6, 4),
+            "p95Ms": round(self.percentile(95) / 1e6, 4),
+            "p99Ms": round(self.percentile(99) / 1e6, 4),
+            "peakMemMB": round(self.peak_bytes / 1e6, 2),
+        }
+
+
+def measure(name, make_call, items=1, repeat=20, warmup=2):
+    """
+    Time `repeat` calls of the callable returned by make_call().
+
+    make_call is invoked before each timed call (untimed) so benchmarks
+    that mutate state can start from a fresh copy. Peak memory comes
+    from one extra call under tracemalloc, kept out of the timings.
+    """
+    for _ in range(warmup):
+        make_call()()
+
+    samples = []
+    for _ in range(repeat):
+        call = make_call()
+        start = time.perf_counter_ns()
+        call()
+        samples.append(time.perf_counter_ns() - start)
+
+    call = make_call()
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchResult(name, items, samples, peak)
@@ -0,0 +1,92 @@
+"""
+Cold-start import budget
+------------------------
+
+Usage (from the repository root):
+
+    python -m benchmarks.imports
+    python -m benchmarks.imports --repeat 9 --scale 2
+
+Imports each worker entry point in a fresh interpreter under
+`python -X importtime` and reports the cumulative import time of the
+module (best of --repeat). Exits non-zero if an entry point goes over
+its budget or pulls in a module it must not load (numpy on the scalar
+paths), so a stray top-level import is caught before it ships.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# entry point -> (budget ms, modules that must stay unloaded)
+BUDGETS = {
+    "accounting.ledger_engine": (10, ("numpy",)),
+    "operations.recharge": (25, ("numpy", "billing")),
+    "billing.prepaid_daily": (40, ("numpy",)),
+    "api": (60, ("numpy",)),
+}
+
+
+def measure_import(module, forbidden=()):
+    """(cumulative import µs, forbidden modules loaded) in a fresh interpreter."""
+    code = "import sys, %s; print(','.join(m for m in %r if m in sys.modules))" % (
+        module, tuple(forbidden))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+    # "import time: self [us] | cumulative | imported package"
+    cumulative = None
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative = int(parts[1])
+
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return cumulative, loaded
+
+
+def run(repeat, scale):
+    results = {}
+    for module, (budget, forbidden) in BUDGETS.items():
+        runs = [measure_import(module, forbidden) for _ in range(repeat)]
+        results[module] = {
+            "ms": min(us for us, _ in runs) / 1000,
+            "budgetMs": budget * scale,
+            "loaded": runs[0][1],
+        }
+    return results
+
+
+def report(results):
+    print("%-28s %10s %10s  %s" % ("entry point", "import ms", "budget", "status"))
+    failed = False
+    for module, r in results.items():
+        problems = []
+        if r["ms"] > r["budgetMs"]:
+            problems.append("over budget")
+        if r["loaded"]:
+            problems.append("loads " + ", ".join(r["loaded"]))
+        failed = failed or bool(problems)
+        print("%-28s %10.2f %10.2f  %s" % (
+            module, r["ms"], r["budgetMs"], "; ".join(problems) or "ok"))
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply every budget, e.g. on slow CI machines")
+    args = parser.parse_args(argv)
+
+    return 1 if report(run(args.repeat, args.scale)) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
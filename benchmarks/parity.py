@@ -0,0 +1,193 @@
+"""
+Engine parity check
+-------------------
+
+Usage (from the repository root):
+
+    python -m benchmarks.parity
+    python -m benchmarks.parity --consumers 100000 --days 5
+
+Bills a seeded SyntheticFleet for several days through the scalar
+PrepaidDailyBilling.run and checks that every fast path reproduces it
+bit for bit:
+
+- PrepaidDailyBatchBilling : response() per consumer, state, ledger rows
+- PrepaidCatchUpBilling    : the whole backlog in one call per consumer
+- StreamingBillingPipeline : state and ledger rows, all days in one chunk
+
+Exits non-zero on any mismatch, so a change to one engine that is not
+mirrored in the others fails before it ships.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from benchmarks.fleet import SyntheticFleet
+from billing.prepaid_catch_up import PrepaidCatchUpBilling
+from billing.prepaid_daily import PrepaidDailyBilling
+from billing.prepaid_daily_batch import PrepaidDailyBatchBilling
+from ingestion.pipeline import StreamingBillingPipeline
+from models.consumer_table import ConsumerTable
+from models.ledger import LEDGER_TYPES, LedgerEntry
+from models.meter import Meter
+
+
+class _ConsumerLedger:
+    """Ledger entries grouped per consumer, in posting order."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def record(self, date, entry_type, amount, balance, consumer_id=None):
+        self.entries.setdefault(consumer_id, []).append(
+            LedgerEntry(date, entry_type, amount, balance).as_dict())
+
+    def record_batch(self, dates, type_codes, amounts, balances, consumer_ids):
+        for date, t, amount, balance, cid in zip(
+            dates, np.asarray(type_codes).tolist(), np.asarray(amounts).tolist(),
+            np.asarray(balances).tolist(), consumer_ids
+        ):
+            self.record(date, LEDGER_TYPES[t], amount, balance, cid)
+
+
+def _days(fleet, days, seed):
+    """Per-day (date, daily_units, max_demand_kw) columns."""
+    rng = np.random.default_rng(seed)
+    return [
+        ("2024-01-%02d" % (d + 1),
+         rng.gamma(2.0, 4.0, len(fleet)).round(2),
+         (fleet.load_kw * rng.uniform(0.3, 1.4, len(fleet))).round(2))
+        for d in range(days)
+    ]
+
+
+def scalar_reference(fleet, days):
+    consumers = fleet.consumers()
+    tariffs = [fleet.tariffs[t] for t in fleet.tariff_ids.tolist()]
+    ledger = _ConsumerLedger()
+    biller = PrepaidDailyBilling()
+
+    responses = []
+    for date, units, demand in days:
+        responses.append([
+            biller.run(c, Meter(u, md), t, fleet.period, ledger, date)
+            for c, u, md, t in zip(consumers, units.tolist(), demand.tolist(), tariffs)
+        ])
+    return consumers, responses, ledger.entries
+
+
+def check_batch(fleet, days, reference):
+    consumers, responses, entries = reference
+    biller = PrepaidDailyBatchBilling(fleet.tariffs)
+    columns = fleet.columns()
+    ledger = _ConsumerLedger()
+
+    for d, (date, units, demand) in enumerate(days):
+        columns.update(daily_units=units, max_demand_kw=demand)
+        result = biller.run(**columns)
+        columns.update(wallet_balance=result["walletBalance"], arrear_balance=result["arrearBalance"])
+
+        for i, expected in enumerate(responses[d]):
+            if biller.response(result, i, expected["breakup"]["slabs"]) != expected:
+                return "response of %s on %s" % (fleet.ids[i], date)
+
+        rows = biller.ledger_rows(result)
+        ledger.record_batch([date] * len(rows["row"]), rows["type"], rows["amount"],
+                            rows["balance"], [fleet.ids[r] for r in rows["row"].tolist()])
+
+    return _compare_state(fleet, consumers, columns["wallet_balance"], columns["arrear_balance"]) \
+        or _compare_ledger(entries, ledger.entries)
+
+
+def check_catch_up(fleet, days, reference, limit):
+    consumers, _, entries = reference
+    biller = PrepaidCatchUpBilling()
+    ledger = _ConsumerLedger()
+    dates = [date for date, _, _ in days]
+
+    fresh = fleet.consumers()[:limit]
+    for i, c in enumerate(fresh):
+        meters = [Meter(float(units[i]), float(demand[i])) for _, units, demand in days]
+        biller.run(c, meters, fleet.tariffs[fleet.tariff_ids[i]], fleet.period, ledger, dates)
+
+    return _compare_state(
+        fleet, consumers[:limit],
+        [c.wallet_balance for c in fresh], [c.arrear_balance for c in fresh]
+    ) or _compare_ledger({cid: entries[cid] for cid in fleet.ids[:limit]}, ledger.entries)
+
+
+def check_pipeline(fleet, days, reference):
+    consumers, _, entries = reference
+    table = ConsumerTable.from_consumers(fleet.consumers())
+    ledger = _ConsumerLedger()
+    n = len(fleet)
+
+    chunk = {
+        "consumer_id": np.asarray(fleet.ids * len(days), dtype=object),
+        "date": np.repeat(np.asarray([date for date, _, _ in days], dtype=object), n),
+        "daily_units": np.concatenate([units for _, units, _ in days]),
+        "max_demand_kw": np.concatenate([demand for _, _, demand in days]),
+    }
+    pipeline = StreamingBillingPipeline(
+        PrepaidDailyBatchBilling(fleet.tariffs), table,
+        dict(zip(fleet.ids, fleet.tariff_ids.tolist())), fleet.period, ledger=ledger)
+    for _ in pipeline.run([chunk]):
+        pass
+
+    return _compare_state(fleet, consumers, table.column("wallet_balance"),
+                          table.column("arrear_balance")) \
+        or _compare_ledger(entries, ledger.entries)
+
+
+def _compare_state(fleet, consumers, wallet, arrear):
+    expected = np.array([(c.wallet_balance, c.arrear_balance) for c in consumers])
+    got = np.column_stack([np.asarray(wallet, dtype=np.float64), np.asarray(arrear, dtype=np.float64)])
+    bad = np.flatnonzero((expected != got).any(axis=1))
+    if len(bad):
+        return "state of %s: %r != %r" % (fleet.ids[bad[0]], got[bad[0]].tolist(), expected[bad[0]].tolist())
+    return None
+
+
+def _compare_ledger(expected, got):
+    for cid, rows in expected.items():
+        if got.get(cid) != rows:
+            return "ledger rows of %s" % (cid,)
+    if got.keys() - expected.keys():
+        return "ledger rows for unbilled consumers"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--consumers", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--slabs", type=int, default=3)
+    parser.add_argument("--tariffs", type=int, default=4)
+    parser.add_argument("--catch-up", type=int, default=2_000,
+                        help="consumers replayed through PrepaidCatchUpBilling")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    fleet = SyntheticFleet(
+        consumers=args.consumers, slabs=args.slabs, tariffs=args.tariffs, seed=args.seed)
+    days = _days(fleet, args.days, args.seed)
+    reference = scalar_reference(fleet, days)
+
+    checks = {
+        "batch": lambda: check_batch(fleet, days, reference),
+        "catch_up": lambda: check_catch_up(fleet, days, reference, args.catch_up),
+        "pipeline": lambda: check_pipeline(fleet, days, reference),
+    }
+
+    failed = False
+    for name, check in checks.items():
+        mismatch = check()
+        failed = failed or mismatch is not None
+        print("%-10s %s" % (name, "MISMATCH " + mismatch if mismatch else "ok"))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
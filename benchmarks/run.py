@@ -0,0 +1,273 @@
+"""
+Billing hot-path benchmarks
+---------------------------
+
+Usage (from the repository root):
+
+    python -m benchmarks.run
+    python -m benchmarks.run --consumers 100000 --slabs 5 --only daily
+    python -m benchmarks.run --json bench.json
+    python -m benchmarks.run --compare bench.json --tolerance 0.25
+
+Each benchmark reports throughput (items/s at median latency), latency
+percentiles per call and peak traced memory. With --compare the run
+exits non-zero if any benchmark's throughput drops by more than the
+tolerance against a previous --json result.
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from accounting.columnar_ledger import ColumnarLedgerEngine
+from accounting.ledger_engine import LedgerEngine
+from benchmarks.fleet import SyntheticFleet
+from benchmarks.harness import measure
+from billing.prepaid_daily import PrepaidDailyBilling
+from billing.prepaid_daily_batch import PrepaidDailyBatchBilling
+from billing.prepaid_monthly import PrepaidMonthlyInvoice
+from billing.tariff_simulation import TariffSimulator
+from tariff.compiled_slab import CompiledSlabTariff
+from tariff.slab import SlabCalculator
+
+
+def _slab_scalar(fleet):
+    calc = SlabCalculator()
+    units = fleet.daily_units.tolist()
+    slabs = [fleet.tariffs[t].slabs for t in fleet.tariff_ids.tolist()]
+
+    def call():
+        for u, s in zip(units, slabs):
+            calc.calculate(u, s)
+    return lambda: call
+
+
+def _slab_compiled(fleet):
+    tables = [CompiledSlabTariff.compile(t.slabs) for t in fleet.tariffs]
+
+    def call():
+        for t, table in enumerate(tables):
+            table.energy(fleet.daily_units[fleet.tariff_ids == t])
+    return lambda: call
+
+
+def _daily_scalar(fleet):
+    meters = fleet.meters()
+    tariffs = [fleet.tariffs[t] for t in fleet.tariff_ids.tolist()]
+
+    def make():
+        consumers = fleet.consumers()
+        ledger = LedgerEngine()
+        biller = PrepaidDailyBilling()
+
+        def call():
+            for c, m, t in zip(consumers, meters, tariffs):
+                biller.run(c, m, t, fleet.period, ledger, "2024-01-01")
+        return call
+    return make
+
+
+def _daily_batch(fleet):
+    biller = PrepaidDailyBatchBilling(fleet.tariffs)
+    columns = fleet.columns()
+
+    def call():
+        biller.ledger_rows(biller.run(**columns))
+    return lambda: call
+
+
+def _ledger_rows(fleet):
+    biller = PrepaidDailyBatchBilling(fleet.tariffs)
+    rows = biller.ledger_rows(biller.run(**fleet.columns()))
+    ids = np.asarray(fleet.ids, dtype=object)[rows["row"]].tolist()
+    return rows, ids
+
+
+def _ledger_record_dict(fleet):
+    rows, ids = _ledger_rows(fleet)
+    args = list(zip(rows["type"].tolist(), rows["amount"].tolist(),
+                    rows["balance"].tolist(), ids))
+    types = ColumnarLedgerEngine().types.values
+
+    def make():
+        ledger = LedgerEngine()
+
+        def call():
+            for t, amount, balance, cid in args:
+                ledger.record("2024-01-01", types[t], amount, balance, cid)
+        return call
+    return make, len(args)
+
+
+def _ledger_record_columnar(fleet):
+    rows, ids = _ledger_rows(fleet)
+
+    def make():
+        ledger = ColumnarLedgerEngine()
+
+        def call():
+            ledger.record_batch(
+                "2024-01-01", rows["type"], rows["amount"], rows["balance"], ids)
+        return call
+    return make, len(ids)
+
+
+def _ledger_snapshot(ledger_cls):
+    def bench(fleet):
+        rows, ids = _ledger_rows(fleet)
+        ledger = ledger_cls()
+        types = ColumnarLedgerEngine().types.values
+        for t, amount, balance, cid in zip(rows["type"].tolist(), rows["amount"].tolist(),
+                                           rows["balance"].tolist(), ids):
+            ledger.record("2024-01-01", types[t], amount, balance, cid)
+
+        def call():
+            sum(e["amount"] for e in ledger.snapshot())
+        return (lambda: call), len(ids)
+    return bench
+
+
+def _ledger_snapshot_columns(fleet):
+    rows, ids = _ledger_rows(fleet)
+    ledger = ColumnarLedgerEngine()
+    ledger.record_batch("2024-01-01", rows["type"], rows["amount"], rows["balance"], ids)
+
+    def call():
+        ledger.snapshot().to_columns()["amount"].sum()
+    return (lambda: call), len(ids)
+
+
+def _monthly(use_index):
+    def bench(fleet, days=30, invoiced=200):
+        consumers = fleet.consumers()[:invoiced]
+        meters = fleet.meters()[:invoiced]
+        ledger = LedgerEngine()
+        biller = PrepaidDailyBilling()
+        for day in range(days):
+            date = "2024-01-%02d" % (day + 1)
+            for c, m, t in zip(consumers, meters, fleet.tariff_ids.tolist()):
+                biller.run(c, m, fleet.tariffs[t], fleet.period, ledger, date)
+
+        invoice = PrepaidMonthlyInvoice()
+        entries = ledger.snapshot()
+        index = ledger.index if use_index else None
+
+        def call():
+            for c in consumers:
+                invoice.generate(c, entries, "2024-01", index=index)
+        return (lambda: call), len(consumers)
+    return bench
+
+
+def _what_if(fleet, days=30, candidates=4):
+    rng = np.random.default_rng(0)
+    consumption = rng.gamma(2.0, 4.0, (len(fleet), days))
+    baseline = dict(enumerate(fleet.tariffs))
+    tariffs = [fleet._tariff(rng, len(fleet.tariffs[0].slabs)) for _ in range(candidates)]
+
+    def make():
+        simulator = TariffSimulator(consumption, fleet.tariff_ids, baseline)
+
+        def call():
+            simulator._cache.clear()
+            simulator.simulate(tariffs)
+        return call
+    return make, len(fleet) * days * candidates
+
+
+BENCHMARKS = {
+    "slab.scalar": _slab_scalar,
+    "slab.compiled_array": _slab_compiled,
+    "daily.scalar": _daily_scalar,
+    "daily.batch": _daily_batch,
+    "ledger.record_dict": _ledger_record_dict,
+    "ledger.record_columnar": _ledger_record_columnar,
+    "ledger.snapshot_dict": _ledger_snapshot(LedgerEngine),
+    "ledger.snapshot_columnar": _ledger_snapshot(ColumnarLedgerEngine),
+    "ledger.snapshot_columns": _ledger_snapshot_columns,
+    "monthly.scan": _monthly(use_index=False),
+    "monthly.index": _monthly(use_index=True),
+    "whatif.simulate": _what_if,
+}
+
+
+def run(args):
+    fleet = SyntheticFleet(
+        consumers=args.consumers,
+        slabs=args.slabs,
+        tariffs=args.tariffs,
+        arrear_share=args.arrear_share,
+        installment_share=args.installment_share,
+        seed=args.seed
+    )
+
+    results = []
+    for name, bench in BENCHMARKS.items():
+        if args.only and args.only not in name:
+            continue
+
+        setup = bench(fleet)
+        make, items = setup if isinstance(setup, tuple) else (setup, len(fleet))
+        results.append(measure(name, make, items=items, repeat=args.repeat).as_dict())
+
+    return results
+
+
+def report(results):
+    header = ("benchmark", "items", "items/s", "p50 ms", "p95 ms", "p99 ms", "peak MB")
+    print("%-26s %9s %14s %10s %10s %10s %9s" % header)
+    for r in results:
+        print("%-26s %9d %14.1f %10.3f %10.3f %10.3f %9.2f" % (
+            r["name"], r["items"], r["throughputPerSec"],
+            r["p50Ms"], r["p95Ms"], r["p99Ms"], r["peakMemMB"]))
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+
+    regressions = []
+    for r in results:
+        base = baseline.get(r["name"])
+        if base is None:
+            continue
+        change = r["throughputPerSec"] / base["throughputPerSec"] - 1
+        if change < -tolerance:
+            regressions.append((r["name"], change))
+
+    for name, change in regressions:
+        print("REGRESSION %-26s throughput %+.1f%%" % (name, change * 100))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--consumers", type=int, default=10_000)
+    parser.add_argument("--slabs", type=int, default=3)
+    parser.add_argument("--tariffs", type=int, default=4)
+    parser.add_argument("--arrear-share", type=float, default=0.3)
+    parser.add_argument("--installment-share", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--only", help="run benchmarks whose name contains this")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON from a previous --json run")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import numpy as np
+
+
+# Collection events, in escalation order. Position is the event code.
+COLLECTION_EVENTS = (
+    "NEGATIVE_ALERT_1",
+    "NEGATIVE_ALERT_2",
+    "PRE_DISCONNECTION_NOTICE",
+    "DISCONNECTED",
+    "RECONNECTED",
+    "WARNING_RESET",
+)
+
+RECONNECTED = COLLECTION_EVENTS.index("RECONNECTED")
+WARNING_RESET = COLLECTION_EVENTS.index("WARNING_RESET")
+
+# Negative-day count at which the supply is disconnected
+DISCONNECT_DAY = 4
+
+
+class CollectionActions:
+    """
+    Vectorised negative-balance state machine for a fleet, indexed by
+    consumer row (as in ConsumerTable / batch billing inputs).
+
+    After each bill that leaves the wallet negative the consumer's
+    negative-day count goes up by one: day 1 and 2 send an SMS alert,
+    day 3 a pre-disconnection notice and day 4 disconnects the supply.
+    A recharge that brings the wallet back to >= 0 reconnects a
+    disconnected consumer, or resets the warning count of one that was
+    only alerted. A bill that leaves the wallet >= 0 changes nothing.
+
+    Both steps return only the consumers whose state changed, as
+    {"row": rows, "event": codes into COLLECTION_EVENTS}, so notification
+    dispatch is a filter on the event column.
+    """
+
+    def __init__(self, size=0):
+        self.negative_days = np.zeros(size, dtype=np.int32)
+        self.disconnected = np.zeros(size, dtype=bool)
+
+    def ensure(self, size):
+        """Grow the state arrays to cover `size` rows (new rows ACTIVE)."""
+        if size > len(self.negative_days):
+            grow = size - len(self.negative_days)
+            self.negative_days = np.concatenate([self.negative_days, np.zeros(grow, np.int32)])
+            self.disconnected = np.concatenate([self.disconnected, np.zeros(grow, bool)])
+
+    def after_billing(self, rows, wallet_balance):
+        """
+        rows           : consumer rows billed in this pass, each at most once
+        wallet_balance : wallet after the bill, per row
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        negative = np.asarray(wallet_balance) < 0
+
+        billed = rows[negative]
+        days = self.negative_days[billed] + 1
+        self.negative_days[billed] = days
+
+        escalated = days <= DISCONNECT_DAY
+        changed, days = billed[escalated], days[escalated]
+        self.disconnected[changed[days == DISCONNECT_DAY]] = True
+
+        return {"row": changed, "event": (days - 1).astype(np.int8)}
+
+    def after_recharge(self, rows, wallet_balance):
+        """
+        rows           : consumer rows recharged, each at most once
+        wallet_balance : wallet after RechargeOperation.apply, per row
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        solvent = np.asarray(wallet_balance) >= 0
+
+        reconnect = solvent & self.disconnected[rows]
+        reset = solvent & ~self.disconnected[rows] & (self.negative_days[rows] > 0)
+        changed = reconnect | reset
+
+        self.disconnected[rows[reconnect]] = False
+        self.negative_days[rows[changed]] = 0
+
+        return {
+            "row": rows[changed],
+            "event": np.where(reconnect[changed], RECONNECTED, WARNING_RESET).astype(np.int8)
+        }
+
+    def status(self, rows=None):
+        disconnected = self.disconnected if rows is None else self.disconnected[rows]
+        return np.where(disconnected, "DISCONNECTED", "ACTIVE")
+
+    @staticmethod
+    def select(events, *names):
+        """Rows of `events` whose event is one of names."""
+        codes = [COLLECTION_EVENTS.index(name) for name in names]
+        return events["row"][np.isin(events["event"], codes)]
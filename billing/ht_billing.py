@@ -0,0 +1,163 @@
+import numpy as np
+
+from accounting.money import from_paise, to_paise_array
+from engine.response import BillingResponse
+from tariff.compiled_slab import CompiledSlabTariff
+
+
+class HTBilling:
+    """
+    HT (High Tension) billing strategy for engine.billing_engine.BillingEngine.
+
+    Billing demand  = max(recorded MD, min_demand_pct x contract demand)
+    Demand charge   = billing demand x tariff.demand_rate
+    Excess demand   = (MD - contract) x demand_rate x excess multiplier
+    Power factor    = kWh / kVAh; each full 0.01 below pf_threshold adds
+                      pf_penalty_rate of the energy charge, each full 0.01
+                      above pf_incentive_threshold rebates pf_incentive_rate.
+                      Without a kVAh reading (NaN) there is no PF adjustment.
+
+    calculate(context) bills one consumer; calculate_batch bills a whole
+    batch of HT consumers in one vectorised pass.
+    """
+
+    def __init__(
+        self,
+        min_demand_pct=0.75,
+        pf_threshold=0.90,
+        pf_penalty_rate=0.01,
+        pf_incentive_threshold=0.95,
+        pf_incentive_rate=0.005
+    ):
+        self.min_demand_pct = min_demand_pct
+        self.pf_threshold = pf_threshold
+        self.pf_penalty_rate = pf_penalty_rate
+        self.pf_incentive_threshold = pf_incentive_threshold
+        self.pf_incentive_rate = pf_incentive_rate
+
+    def calculate(self, context):
+        meter = context.meter
+        kvah = meter.kvah if meter.kvah is not None else np.nan
+
+        result = self.calculate_batch(
+            kwh=[meter.daily_units],
+            kvah=[kvah],
+            recorded_demand=[meter.max_demand_kw],
+            contract_demand=[context.consumer.load_kw],
+            tariff_ids=[0],
+            tariffs=[context.tariff],
+            period=context.period
+        )
+        r = {key: float(value[0]) for key, value in result.items()}
+
+        breakup = {
+            "energy": r["energy"],
+            "fixed": r["fixed"],
+            "demand": {
+                "billingDemand": round(r["billingDemand"], 2),
+                "charge": r["demandCharge"]
+            },
+            "excessDemand": {
+                "excessKW": round(r["excessKW"], 2),
+                "penalty": r["excessPenalty"]
+            },
+            "powerFactor": {
+                "pf": round(r["powerFactor"], 3) if not np.isnan(r["powerFactor"]) else None,
+                "penalty": r["pfPenalty"],
+                "incentive": r["pfIncentive"]
+            },
+            "duty": r["duty"]
+        }
+        state = {"contractDemand": context.consumer.load_kw}
+
+        return BillingResponse("HT", r["total"], breakup, state).to_json()
+
+    def calculate_batch(
+        self,
+        kwh,
+        kvah,
+        recorded_demand,
+        contract_demand,
+        tariff_ids,
+        tariffs,
+        period=None
+    ):
+        """
+        Column arrays in, column arrays out. period, when given, prorates
+        the monthly fixed and demand charges by period.days / 30. kvah is
+        NaN (or 0) where no apparent-energy reading exists. Each charge is posted
+        in whole paise (accounting.money), as the prepaid engines do.
+        """
+        kwh = np.asarray(kwh, dtype=np.float64)
+        kvah = np.asarray(kvah, dtype=np.float64)
+        md = np.asarray(recorded_demand, dtype=np.float64)
+        contract = np.asarray(contract_demand, dtype=np.float64)
+        tariff_ids = np.asarray(tariff_ids, dtype=np.intp)
+
+        demand_rate = np.array([t.demand_rate for t in tariffs])[tariff_ids]
+        multiplier = np.array([t.excess_demand_multiplier for t in tariffs])[tariff_ids]
+        fixed_charge = np.array([t.fixed_charge for t in tariffs])[tariff_ids]
+        duty_rate = np.array([t.duty_rate for t in tariffs])[tariff_ids]
+        share = 1.0 if period is None else period.days / 30
+
+        # -----------------------------
+        # 1. Energy Charges (Slab Based)
+        # -----------------------------
+        energy = np.zeros_like(kwh)
+        for t in np.unique(tariff_ids):
+            rows = tariff_ids == t
+            energy[rows] = CompiledSlabTariff.compile(tariffs[t].slabs).energy(kwh[rows])
+        energy_p = to_paise_array(energy)
+        energy = from_paise(energy_p)
+
+        # -----------------------------
+        # 2. Demand Charges
+        # -----------------------------
+        billing_demand = np.maximum(md, self.min_demand_pct * contract)
+        demand_p = to_paise_array(billing_demand * demand_rate * share)
+
+        excess_kw = np.where(md > contract, md - contract, 0.0)
+        excess_p = to_paise_array(excess_kw * demand_rate * multiplier)
+
+        # -----------------------------
+        # 3. Power Factor Adjustment
+        # -----------------------------
+        # Missing (NaN) or zero kVAh leaves pf unknown: no penalty, no
+        # incentive (NaN > 0 is False)
+        known = kvah > 0
+        pf = np.where(known, np.minimum(kwh / np.where(known, kvah, 1.0), 1.0), np.nan)
+        pf_known = np.where(known, pf, 1.0)
+
+        # Full 0.01 steps; the epsilon absorbs float noise at exact steps
+        below = np.floor(np.maximum(self.pf_threshold - pf_known, 0) * 100 + 1e-9)
+        above = np.floor(np.maximum(pf_known - self.pf_incentive_threshold, 0) * 100 + 1e-9)
+        below[~known] = 0.0
+        above[~known] = 0.0
+
+        pf_penalty_p = to_paise_array(energy * below * self.pf_penalty_rate)
+        pf_incentive_p = to_paise_array(energy * above * self.pf_incentive_rate)
+
+        # -----------------------------
+        # 4. Fixed, Duty & Total
+        # -----------------------------
+        fixed_p = to_paise_array(fixed_charge * share)
+        duty_p = to_paise_array(energy * duty_rate)
+
+        total_p = (
+            energy_p + fixed_p + demand_p + excess_p +
+            pf_penalty_p - pf_incentive_p + duty_p
+        )
+
+        return {
+            "energy": energy,
+            "fixed": from_paise(fixed_p),
+            "billingDemand": billing_demand,
+            "demandCharge": from_paise(demand_p),
+            "excessKW": excess_kw,
+            "excessPenalty": from_paise(excess_p),
+            "powerFactor": pf,
+            "pfPenalty": from_paise(pf_penalty_p),
+            "pfIncentive": from_paise(pf_incentive_p),
+            "duty": from_paise(duty_p),
+            "total": from_paise(total_p)
+        }
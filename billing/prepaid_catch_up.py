@@ -0,0 +1,104 @@
+import numpy as np
+
+from accounting.money import from_paise, to_paise, to_paise_array
+from operations.arrear_catch_up import ArrearCatchUp
+from operations.installment import InstallmentEngine
+from tariff.compiled_slab import CompiledSlabTariff
+
+
+class PrepaidCatchUpBilling:
+    """
+    Bills a backlog of daily reads for one consumer in a single pass,
+    with the same state and ledger entries as calling
+    PrepaidDailyBilling.run once per day in date order.
+    """
+
+    def run(self, consumer, meters, tariff, period, ledger, dates):
+        units = np.array([m.daily_units for m in meters], dtype=np.float64)
+        max_demand = np.array([m.max_demand_kw for m in meters], dtype=np.float64)
+        days = len(units)
+
+        # -----------------------------
+        # 1. DPS on Arrear / 4. Installment (integer paise)
+        # -----------------------------
+        installment_p = to_paise(InstallmentEngine.daily_amount(consumer.installment))
+        arrear = ArrearCatchUp.daily_paise(
+            to_paise(consumer.arrear_balance),
+            tariff.dps_monthly_rate,
+            installment_p,
+            days
+        )
+        dps_p = arrear["dps"]
+
+        # -----------------------------
+        # 2. Energy Charges (Slab Based)
+        # -----------------------------
+        energy_p = to_paise_array(CompiledSlabTariff.compile(tariff.slabs).energy(units))
+        fixed_p = to_paise(tariff.fixed_charge / period.days)
+        duty_p = to_paise_array(from_paise(energy_p) * tariff.duty_rate)
+
+        daily_charge_p = energy_p + fixed_p + duty_p
+
+        # -----------------------------
+        # 3. Excess Demand Penalty
+        # -----------------------------
+        excess_kw = np.where(
+            max_demand > consumer.load_kw, max_demand - consumer.load_kw, 0.0)
+        excess_p = to_paise_array(
+            excess_kw * tariff.demand_rate * tariff.excess_demand_multiplier)
+
+        # -----------------------------
+        # 5. Total Wallet Deduction
+        # -----------------------------
+        total_p = daily_charge_p + installment_p + excess_p
+        wallet_p = to_paise(consumer.wallet_balance) - np.cumsum(total_p)
+
+        if days:
+            consumer.wallet_balance = from_paise(int(wallet_p[-1]))
+            consumer.arrear_balance = from_paise(int(arrear["arrearBalance"][-1]))
+
+        # -----------------------------
+        # 6. Ledger Entries (Audit Safe)
+        # -----------------------------
+        cid = consumer.consumer_id
+        energy, duty, dps = (from_paise(x).tolist() for x in (energy_p, duty_p, dps_p))
+        penalty = from_paise(excess_p).tolist()
+        balances = from_paise(wallet_p).tolist()
+        fixed = from_paise(fixed_p)
+        installment = from_paise(installment_p)
+
+        for i, date in enumerate(dates):
+            balance = balances[i]
+            ledger.record(date, "ENERGY", energy[i], balance, cid)
+            ledger.record(date, "FIXED", fixed, balance, cid)
+            ledger.record(date, "DUTY", duty[i], balance, cid)
+            ledger.record(date, "DPS", dps[i], balance, cid)
+
+            if installment_p > 0:
+                ledger.record(date, "INSTALLMENT_RECOVERY", installment, balance, cid)
+
+            if penalty[i] > 0:
+                ledger.record(date, "EXCESS_DEMAND_PENALTY", penalty[i], balance, cid)
+
+        # -----------------------------
+        # 7. Response (Frontend Ready)
+        # -----------------------------
+        return {
+            "days": days,
+            "totalDeduction": from_paise(int(total_p.sum())),
+            "breakup": {
+                "energy": from_paise(int(energy_p.sum())),
+                "fixed": from_paise(fixed_p * days),
+                "duty": from_paise(int(duty_p.sum())),
+                "dps": from_paise(int(dps_p.sum())),
+                "installment": from_paise(installment_p * days),
+                "excessDemand": {
+                    "excessKW": round(float(excess_kw.sum()), 2),
+                    "penalty": from_paise(int(excess_p.sum()))
+                }
+            },
+            "state": {
+                "walletBalance": consumer.wallet_balance,
+                "arrearBalance": consumer.arrear_balance
+            }
+        }
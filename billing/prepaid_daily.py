@@ -1,3 +1,4 @@
+from accounting.money import from_paise, to_paise
 from tariff.slab import SlabCalculator
 from operations.dps import DPSCalculator
 from operations.installment import InstallmentEngine
@@ -6,16 +7,41 @@ from operations.excess_demand import ExcessDemandPenalty
 
 class PrepaidDailyBilling:
 
-    def run(self, consumer, meter, tariff, period, ledger, date):
+    def run(
+        self, consumer, meter, tariff, period, ledger, date,
+        settlement=None, locks=None, metrics=None
+    ):
+        """
+        locks  : optional operations.locking.ConsumerLocks; the whole bill is
+                 applied under the consumer's lock so a concurrent recharge
+                 cannot interleave with the balance updates.
+        metrics: optional engine.instrumentation.BillingMetrics; times each
+                 numbered stage and counts bills, ledger rows and negative
+                 wallets.
+        """
+        if locks is not None:
+            with locks.hold(consumer.consumer_id):
+                return self.run(
+                    consumer, meter, tariff, period, ledger, date, settlement, metrics=metrics)
+
+        timer = metrics.timer() if metrics is not None else None
+
+        # Every posting is rounded to whole paise once (accounting.money)
+        # and balances move by exact integer paise.
+        wallet_p = to_paise(consumer.wallet_balance)
+        arrear_p = to_paise(consumer.arrear_balance)
 
         # -----------------------------
         # 1. DPS on Arrear
         # -----------------------------
-        dps = DPSCalculator.daily(
-            consumer.arrear_balance,
+        dps_p = to_paise(DPSCalculator.daily(
+            from_paise(arrear_p),
             tariff.dps_monthly_rate
-        )
-        consumer.arrear_balance += dps
+        ))
+        arrear_p += dps_p
+
+        if timer:
+            timer.lap("dps")
 
         # -----------------------------
         # 2. Energy Charges (Slab Based)
@@ -26,10 +52,18 @@ class PrepaidDailyBilling:
             tariff.slabs
         )
 
-        fixed = tariff.fixed_charge / period.days
-        duty = energy * tariff.duty_rate
+        energy_p = to_paise(energy)
+        fixed_p = to_paise(tariff.fixed_charge / period.days)
+        duty_p = to_paise(from_paise(energy_p) * tariff.duty_rate)
 
-        daily_charge = energy + fixed + duty
+        daily_charge_p = energy_p + fixed_p + duty_p
+
+        if settlement is not None:
+            settlement.add(
+                consumer.consumer_id, date, meter.daily_units, from_paise(daily_charge_p))
+
+        if timer:
+            timer.lap("energy")
 
         # -----------------------------
         # 3. Excess Demand Penalty
@@ -40,65 +74,86 @@ class PrepaidDailyBilling:
             demand_rate=tariff.demand_rate,
             multiplier=tariff.excess_demand_multiplier
         )
+        excess_p = to_paise(excess_penalty)
+
+        if timer:
+            timer.lap("demand_penalty")
 
         # -----------------------------
         # 4. Installment Deduction
         # -----------------------------
-        installment = InstallmentEngine.daily_amount(
+        installment_p = to_paise(InstallmentEngine.daily_amount(
             consumer.installment
-        )
-        consumer.arrear_balance -= installment
+        ))
+        arrear_p -= installment_p
+        consumer.arrear_balance = from_paise(arrear_p)
+
+        if timer:
+            timer.lap("installment")
 
         # -----------------------------
         # 5. Total Wallet Deduction
         # -----------------------------
-        total_deduction = (
-            daily_charge +
-            installment +
-            excess_penalty
-        )
+        total_p = daily_charge_p + installment_p + excess_p
+
+        wallet_p -= total_p
+        consumer.wallet_balance = balance = from_paise(wallet_p)
 
-        consumer.wallet_balance -= total_deduction
+        if timer:
+            timer.lap("wallet")
 
         # -----------------------------
         # 6. Ledger Entries (Audit Safe)
         # -----------------------------
-        ledger.record(date, "ENERGY", energy, consumer.wallet_balance)
-        ledger.record(date, "FIXED", fixed, consumer.wallet_balance)
-        ledger.record(date, "DUTY", duty, consumer.wallet_balance)
-        ledger.record(date, "DPS", dps, consumer.wallet_balance)
+        cid = consumer.consumer_id
+        ledger.record(date, "ENERGY", from_paise(energy_p), balance, cid)
+        ledger.record(date, "FIXED", from_paise(fixed_p), balance, cid)
+        ledger.record(date, "DUTY", from_paise(duty_p), balance, cid)
+        ledger.record(date, "DPS", from_paise(dps_p), balance, cid)
 
-        if installment > 0:
+        if installment_p > 0:
             ledger.record(
                 date, "INSTALLMENT_RECOVERY",
-                installment, consumer.wallet_balance
+                from_paise(installment_p), balance, cid
             )
 
-        if excess_penalty > 0:
+        if excess_p > 0:
             ledger.record(
                 date, "EXCESS_DEMAND_PENALTY",
-                excess_penalty, consumer.wallet_balance
+                from_paise(excess_p), balance, cid
             )
 
+        if timer:
+            timer.lap("ledger")
+
         # -----------------------------
         # 7. Response (Frontend Ready)
         # -----------------------------
-        return {
-            "totalDeduction": round(total_deduction, 2),
+        response = {
+            "totalDeduction": from_paise(total_p),
             "breakup": {
-                "energy": round(energy, 2),
-                "fixed": round(fixed, 2),
-                "duty": round(duty, 2),
-                "dps": round(dps, 2),
-                "installment": round(installment, 2),
+                "energy": from_paise(energy_p),
+                "fixed": from_paise(fixed_p),
+                "duty": from_paise(duty_p),
+                "dps": from_paise(dps_p),
+                "installment": from_paise(installment_p),
                 "excessDemand": {
                     "excessKW": round(excess_kw, 2),
-                    "penalty": round(excess_penalty, 2)
+                    "penalty": from_paise(excess_p)
                 },
                 "slabs": slab_breakup
             },
             "state": {
-                "walletBalance": round(consumer.wallet_balance, 2),
-                "arrearBalance": round(consumer.arrear_balance, 2)
+                "walletBalance": balance,
+                "arrearBalance": consumer.arrear_balance
             }
         }
+
+        if timer:
+            timer.lap("response")
+            metrics.count("bills")
+            metrics.count("ledger_rows", 4 + (installment_p > 0) + (excess_p > 0))
+            if wallet_p < 0:
+                metrics.count("negative_wallets")
+
+        return response
@@ -0,0 +1,175 @@
+import numpy as np
+
+from accounting.money import from_paise, to_paise_array
+from tariff.compiled_slab import CompiledSlabTariff
+
+
+class PrepaidDailyBatchBilling:
+    """
+    Fleet-wide equivalent of PrepaidDailyBilling.run.
+
+    Inputs and outputs are columnar (one array element per consumer);
+    tariff_ids index into the tariffs given at construction.
+    """
+
+    def __init__(self, tariffs):
+        self.tariffs = list(tariffs)
+        self.slab_tables = [
+            CompiledSlabTariff.compile(t.slabs) for t in self.tariffs
+        ]
+
+        self.fixed_charge = np.array(
+            [t.fixed_charge for t in self.tariffs], dtype=np.float64)
+        self.duty_rate = np.array(
+            [t.duty_rate for t in self.tariffs], dtype=np.float64)
+        self.dps_daily_rate = np.array(
+            [t.dps_monthly_rate / 30 for t in self.tariffs], dtype=np.float64)
+        self.demand_rate = np.array(
+            [t.demand_rate for t in self.tariffs], dtype=np.float64)
+        self.excess_multiplier = np.array(
+            [t.excess_demand_multiplier for t in self.tariffs], dtype=np.float64)
+
+    def run(
+        self,
+        wallet_balance,
+        arrear_balance,
+        load_kw,
+        installment_daily,
+        daily_units,
+        max_demand_kw,
+        tariff_ids,
+        period
+    ):
+        wallet = np.asarray(wallet_balance, dtype=np.float64)
+        arrear = np.asarray(arrear_balance, dtype=np.float64)
+        load_kw = np.asarray(load_kw, dtype=np.float64)
+        installment = np.asarray(installment_daily, dtype=np.float64)
+        units = np.asarray(daily_units, dtype=np.float64)
+        max_demand = np.asarray(max_demand_kw, dtype=np.float64)
+        tariff_ids = np.asarray(tariff_ids, dtype=np.intp)
+
+        # Same paise posting rule as PrepaidDailyBilling.run, so every
+        # column is bit-identical to the scalar engine.
+        wallet_p = to_paise_array(wallet)
+        arrear_p = to_paise_array(arrear)
+
+        # -----------------------------
+        # 1. DPS on Arrear
+        # -----------------------------
+        arrear = from_paise(arrear_p)
+        dps_p = to_paise_array(np.where(
+            arrear > 0,
+            arrear * self.dps_daily_rate[tariff_ids],
+            0.0
+        ))
+        arrear_p = arrear_p + dps_p
+
+        # -----------------------------
+        # 2. Energy Charges (Slab Based)
+        # -----------------------------
+        energy_p = to_paise_array(self._energy(units, tariff_ids))
+        fixed_p = to_paise_array(self.fixed_charge[tariff_ids] / period.days)
+        duty_p = to_paise_array(from_paise(energy_p) * self.duty_rate[tariff_ids])
+
+        daily_charge_p = energy_p + fixed_p + duty_p
+
+        # -----------------------------
+        # 3. Excess Demand Penalty
+        # -----------------------------
+        excess_kw = np.where(max_demand > load_kw, max_demand - load_kw, 0.0)
+        excess_p = to_paise_array(
+            excess_kw
+            * self.demand_rate[tariff_ids]
+            * self.excess_multiplier[tariff_ids]
+        )
+
+        # -----------------------------
+        # 4. Installment Deduction
+        # -----------------------------
+        installment_p = to_paise_array(installment)
+        arrear_p = arrear_p - installment_p
+
+        # -----------------------------
+        # 5. Total Wallet Deduction
+        # -----------------------------
+        total_p = daily_charge_p + installment_p + excess_p
+        wallet_p = wallet_p - total_p
+
+        return {
+            "totalDeduction": from_paise(total_p),
+            "energy": from_paise(energy_p),
+            "fixed": from_paise(fixed_p),
+            "duty": from_paise(duty_p),
+            "dps": from_paise(dps_p),
+            "installment": from_paise(installment_p),
+            "excessKW": excess_kw,
+            "excessPenalty": from_paise(excess_p),
+            "walletBalance": from_paise(wallet_p),
+            "arrearBalance": from_paise(arrear_p)
+        }
+
+    def _energy(self, units, tariff_ids):
+        energy = np.zeros_like(units)
+
+        for tariff_id in np.unique(tariff_ids):
+            rows = np.flatnonzero(tariff_ids == tariff_id)
+            energy[rows] = self.slab_tables[tariff_id].energy(units[rows])
+
+        return energy
+
+    def ledger_rows(self, result):
+        """
+        Columnar ledger rows in the order PrepaidDailyBilling.run records
+        them: consumer by consumer, zero installment/penalty rows skipped.
+        Type codes index models.ledger.LEDGER_TYPES.
+        """
+        amounts = np.column_stack([
+            result["energy"],
+            result["fixed"],
+            result["duty"],
+            result["dps"],
+            result["installment"],
+            result["excessPenalty"],
+        ])
+
+        keep = np.ones(amounts.shape, dtype=bool)
+        keep[:, 4] = amounts[:, 4] > 0
+        keep[:, 5] = amounts[:, 5] > 0
+
+        rows, types = np.nonzero(keep)
+
+        return {
+            "row": rows,
+            "type": types.astype(np.int8),
+            "amount": amounts[rows, types],
+            "balance": result["walletBalance"][rows]
+        }
+
+    @staticmethod
+    def response(result, i, slab_breakup=None):
+        """
+        Scalar-shaped response for row i, identical to what
+        PrepaidDailyBilling.run returns for the same consumer.
+        """
+        def r(key):
+            return float(result[key][i])
+
+        return {
+            "totalDeduction": r("totalDeduction"),
+            "breakup": {
+                "energy": r("energy"),
+                "fixed": r("fixed"),
+                "duty": r("duty"),
+                "dps": r("dps"),
+                "installment": r("installment"),
+                "excessDemand": {
+                    "excessKW": round(r("excessKW"), 2),
+                    "penalty": r("excessPenalty")
+                },
+                "slabs": slab_breakup
+            },
+            "state": {
+                "walletBalance": r("walletBalance"),
+                "arrearBalance": r("arrearBalance")
+            }
+        }
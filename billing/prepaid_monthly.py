@@ -1,6 +1,22 @@
+from accounting.ledger_index import LedgerIndex
+
+# Ledger entry type -> invoice summary key
+SUMMARY_TYPES = {
+    "ENERGY": "energy",
+    "FIXED": "fixed",
+    "DPS": "dps",
+    "INSTALLMENT_RECOVERY": "installment"
+}
+
+
 class PrepaidMonthlyInvoice:
 
-    def generate(self, consumer, ledger_entries, month):
+    def generate(self, consumer, ledger_entries, month, index=None):
+        """
+        index : optional LedgerIndex (e.g. ledger.index); when given the
+                summary is read from its running totals instead of
+                scanning ledger_entries.
+        """
 
         summary = {
             "energy": 0,
@@ -9,9 +25,15 @@ class PrepaidMonthlyInvoice:
             "installment": 0
         }
 
-        for e in ledger_entries:
-            if e["type"] in summary:
-                summary[e["type"].lower()] += e["amount"]
+        if index is not None:
+            totals = index.month_totals(consumer.consumer_id, month)
+            for entry_type, key in SUMMARY_TYPES.items():
+                summary[key] += totals.get(entry_type, 0)
+        else:
+            for e in ledger_entries:
+                key = SUMMARY_TYPES.get(e["type"])
+                if key and LedgerIndex.month_of(e["date"]) == month:
+                    summary[key] += e["amount"]
 
         return {
             "consumerId": consumer.consumer_id,
@@ -0,0 +1,200 @@
+import numpy as np
+
+from tariff.compiled_slab import CompiledSlabTariff
+
+
+def tariff_key(tariff):
+    """Hashable content key of a Tariff (TariffVersion already has one)."""
+    key = getattr(tariff, "key", None)
+    if key is not None:
+        return key
+    return (
+        tuple((s["upto"], s["rate"]) for s in tariff.slabs),
+        tariff.fixed_charge,
+        tariff.duty_rate,
+    )
+
+
+class TariffSimulator:
+    """
+    What-if re-billing of stored consumption under candidate tariffs.
+
+    consumption : (consumers x days) units matrix
+    categories  : category per consumer
+    baseline    : mapping category -> current Tariff
+    mode        : "daily"   slabs applied to each day's units, fixed
+                            charge per day, as PrepaidDailyBilling does
+                  "monthly" slabs applied to each month's units, fixed
+                            charge per month (month = period_days days,
+                            a trailing partial month prorated by days)
+
+    A slab charge is sum_k rate_k * (R(lower_k) - R(upper_k)) with
+    R(x) = sum over days of max(u - x, 0). R is evaluated once for every
+    distinct slab threshold of all tariffs being simulated (broadcast over
+    a chunk of consumers), so the energy of every tariff comes out of a
+    single matrix product. Bills are cached per (tariff content, category).
+    """
+
+    SHOCK_BINS = (-np.inf, -0.10, -0.05, 0.0, 0.05, 0.10, 0.20, 0.50, np.inf)
+
+    def __init__(self, consumption, categories, baseline, mode="daily", period_days=30,
+                 chunk_elements=1 << 23):
+        consumption = np.asarray(consumption, dtype=np.float64)
+        history_days = consumption.shape[1]
+        if mode == "monthly":
+            starts = np.arange(0, consumption.shape[1], period_days)
+            consumption = np.add.reduceat(consumption, starts, axis=1)
+        elif mode != "daily":
+            raise ValueError("mode must be 'daily' or 'monthly'")
+
+        self.units = consumption
+        self.mode = mode
+        self.period_days = period_days
+        self.chunk_elements = chunk_elements
+
+        self.categories = np.asarray(categories)
+        self.category_names, self.category_codes = np.unique(self.categories, return_inverse=True)
+        self.rows = {
+            name: np.flatnonzero(self.category_codes == code)
+            for code, name in enumerate(self.category_names.tolist())
+        }
+
+        self.baseline = dict(baseline)
+        # Fixed charge per period_days of history; in monthly mode a
+        # trailing partial month is charged for the days it covers
+        self.charge_periods = history_days / period_days
+        self._cache = {}        # (tariff key, category) -> bills of the category's rows
+
+    # -----------------------------
+    # Bills
+    # -----------------------------
+    def bills(self, structure):
+        """
+        Per-consumer bill over the whole history. structure is a Tariff
+        for every category or a mapping category -> Tariff (categories
+        not in it keep their baseline tariff).
+        """
+        structure = self._structure(structure)
+        self._evaluate([structure])
+
+        out = np.zeros(len(self.categories))
+        for category, rows in self.rows.items():
+            out[rows] = self._cache[(tariff_key(structure[category]), category)]
+        return out
+
+    def simulate(self, candidates, shock_threshold=0.10):
+        """
+        One report per candidate: revenue, per-category impact and the
+        distribution of per-consumer bill changes against the baseline.
+        """
+        structures = [self._structure(c) for c in candidates]
+        self._evaluate([self.baseline] + structures)
+
+        base = self.bills(self.baseline)
+        return [self._report(base, self.bills(s), shock_threshold) for s in structures]
+
+    def _report(self, base, bills, shock_threshold):
+        categories = {}
+        for category, rows in self.rows.items():
+            before, after = base[rows].sum(), bills[rows].sum()
+            categories[category] = {
+                "consumers": len(rows),
+                "baselineRevenue": round(float(before), 2),
+                "revenue": round(float(after), 2),
+                "change": round(float(after - before), 2),
+                "changePct": round(float((after - before) / before * 100), 2) if before else None
+            }
+
+        billed = base > 0
+        change = np.zeros_like(base)
+        change[billed] = bills[billed] / base[billed] - 1
+        change = change[billed]
+
+        counts, _ = np.histogram(change, bins=self.SHOCK_BINS)
+        labels = [
+            "%s..%s" % (self._pct(lo), self._pct(hi))
+            for lo, hi in zip(self.SHOCK_BINS[:-1], self.SHOCK_BINS[1:])
+        ]
+        p50, p90, p99 = (np.percentile(change, (50, 90, 99)) if len(change) else (0.0, 0.0, 0.0))
+
+        revenue, baseline = bills.sum(), base.sum()
+        return {
+            "baselineRevenue": round(float(baseline), 2),
+            "revenue": round(float(revenue), 2),
+            "revenueChange": round(float(revenue - baseline), 2),
+            "categories": categories,
+            "billShock": {
+                "histogram": dict(zip(labels, counts.tolist())),
+                "p50Pct": round(float(p50) * 100, 2),
+                "p90Pct": round(float(p90) * 100, 2),
+                "p99Pct": round(float(p99) * 100, 2),
+                "shareAboveThreshold": round(float((change > shock_threshold).mean()), 4)
+                if len(change) else 0.0
+            }
+        }
+
+    # -----------------------------
+    # Evaluation
+    # -----------------------------
+    def _evaluate(self, structures):
+        for category, rows in self.rows.items():
+            pending = {}
+            for structure in structures:
+                tariff = structure[category]
+                key = (tariff_key(tariff), category)
+                if key not in self._cache:
+                    pending[key] = tariff
+            if not pending:
+                continue
+
+            tariffs = list(pending.values())
+            energy = self._energy(self.units[rows], tariffs)
+            for (key, tariff), e in zip(pending.items(), energy):
+                fixed = tariff.fixed_charge * self.charge_periods
+                self._cache[key] = e + e * tariff.duty_rate + fixed
+
+    def _energy(self, units, tariffs):
+        """(tariffs x consumers) energy charge summed over the history."""
+        thresholds, weights = self._basis(tariffs)
+        energy = np.empty((len(tariffs), len(units)))
+
+        per_row = max(units.shape[1] * len(thresholds), 1)
+        step = max(self.chunk_elements // per_row, 1)
+        for start in range(0, len(units), step):
+            u = units[start:start + step]
+            # R[c, m] = sum_d max(u[c, d] - threshold[m], 0)
+            r = np.maximum(u[:, :, None] - thresholds, 0.0).sum(axis=1)
+            energy[:, start:start + step] = (r @ weights).T
+        return energy
+
+    @staticmethod
+    def _basis(tariffs):
+        tables = [CompiledSlabTariff.compile(t.slabs) for t in tariffs]
+        bounds = sorted({
+            x for table in tables for x in table.lower + table.upper if x != float("inf")
+        })
+        position = {x: i for i, x in enumerate(bounds)}
+
+        weights = np.zeros((len(bounds), len(tables)))
+        for j, table in enumerate(tables):
+            for rate, lower, upper in zip(table.rates, table.lower, table.upper):
+                weights[position[lower], j] += rate
+                if upper != float("inf"):
+                    weights[position[upper], j] -= rate
+        return np.array(bounds, dtype=np.float64), weights
+
+    def _structure(self, candidate):
+        if isinstance(candidate, dict):
+            structure = dict(self.baseline)
+            structure.update(candidate)
+        else:
+            structure = {category: candidate for category in self.rows}
+
+        missing = [c for c in self.rows if c not in structure]
+        if missing:
+            raise KeyError("No tariff for categories %r" % (missing,))
+        return structure
+
+    @staticmethod
+    def _pct(x):
+        return "%+g%%" % (x * 100) if np.isfinite(x) else ("-inf" if x < 0 else "+inf")
@@ -0,0 +1,160 @@
+import json
+import os
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:                     # Falls back to .npy row groups
+    pa = None
+
+from accounting.money import round2
+from models.ledger import LEDGER_TYPES
+
+
+BILL_COLUMNS = (
+    "totalDeduction", "energy", "fixed", "duty", "dps", "installment",
+    "excessKW", "excessPenalty", "walletBalance", "arrearBalance",
+)
+
+
+class ColumnarSink:
+    """
+    Streams column batches to Parquet, Arrow IPC or NumPy .npy files,
+    one row group per write(), without building per-row dicts.
+
+    format       : "parquet" / "arrow" (need pyarrow) or "npy"; None picks
+                   parquet when pyarrow is installed, else npy
+    dictionaries : {column: values} for integer code columns, e.g.
+                   {"type": LEDGER_TYPES}; written as Arrow dictionary
+                   columns, or listed in the npy schema file
+
+    The npy format writes target/part-NNNNNN/<column>.npy per row group
+    plus target/_schema.json; load_npy() reads it back.
+    """
+
+    def __init__(self, target, format=None, dictionaries=None, compression="zstd"):
+        if format is None:
+            format = "parquet" if pa is not None else "npy"
+        if format in ("parquet", "arrow") and pa is None:
+            raise ImportError("pyarrow is required for %s output" % format)
+        if format not in ("parquet", "arrow", "npy"):
+            raise ValueError("format must be 'parquet', 'arrow' or 'npy'")
+
+        self.target = target
+        self.format = format
+        self.dictionaries = dict(dictionaries or {})
+        self.compression = compression
+        self.rows = 0
+        self.row_groups = 0
+        self._names = None
+        self._writer = None
+
+        if format == "npy":
+            os.makedirs(target, exist_ok=True)
+
+    def write(self, columns):
+        names = list(columns)
+        if self._names is None:
+            self._names = names
+        elif names != self._names:
+            raise ValueError("Columns differ from the first row group")
+
+        n = len(columns[names[0]])
+        if n == 0:
+            return
+
+        if self.format == "npy":
+            self._write_npy(columns)
+        else:
+            self._write_arrow(columns)
+
+        self.rows += n
+        self.row_groups += 1
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+        if self.format == "npy":
+            with open(os.path.join(self.target, "_schema.json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    "columns": self._names or [],
+                    "dictionaries": {k: list(v) for k, v in self.dictionaries.items()},
+                    "rowGroups": self.row_groups,
+                    "rows": self.rows
+                }, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_npy(self, columns):
+        part = os.path.join(self.target, "part-%06d" % self.row_groups)
+        os.makedirs(part, exist_ok=True)
+        for name, values in columns.items():
+            values = np.asarray(values)
+            if values.dtype == object:
+                values = values.astype(str)
+            np.save(os.path.join(part, name + ".npy"), values, allow_pickle=False)
+
+    def _write_arrow(self, columns):
+        arrays = []
+        for name, values in columns.items():
+            values = np.asarray(values)
+            if name in self.dictionaries:
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(values.astype(np.int32)), pa.array(list(self.dictionaries[name]))))
+            elif values.dtype == object:
+                arrays.append(pa.array(values.tolist()))
+            else:
+                arrays.append(pa.array(values))
+        batch = pa.RecordBatch.from_arrays(arrays, names=self._names)
+
+        if self._writer is None:
+            if self.format == "parquet":
+                self._writer = pq.ParquetWriter(
+                    self.target, batch.schema, compression=self.compression)
+            else:
+                self._writer = pa.ipc.new_file(self.target, batch.schema)
+
+        if self.format == "parquet":
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+
+    # -----------------------------
+    # Column builders
+    # -----------------------------
+    @staticmethod
+    def bill_columns(result, consumer_ids, date):
+        """PrepaidDailyBatchBilling.run result -> export columns."""
+        columns = {
+            "consumerId": np.asarray(consumer_ids, dtype=object),
+            "date": np.full(len(result["totalDeduction"]), str(date), dtype=object),
+        }
+        for name in BILL_COLUMNS:
+            columns[name] = round2(result[name])
+        return columns
+
+    @staticmethod
+    def ledger_sink(target, format=None):
+        return ColumnarSink(target, format, dictionaries={"type": LEDGER_TYPES})
+
+    @staticmethod
+    def load_npy(target):
+        """Concatenate an npy sink's row groups back into columns."""
+        with open(os.path.join(target, "_schema.json"), encoding="utf-8") as f:
+            schema = json.load(f)
+
+        parts = [os.path.join(target, "part-%06d" % i) for i in range(schema["rowGroups"])]
+        return {
+            name: np.concatenate([np.load(os.path.join(p, name + ".npy")) for p in parts])
+            if parts else np.empty(0)
+            for name in schema["columns"]
+        }
@@ -1,4 +1,6 @@
 class BillingContext:
+    __slots__ = ("consumer", "meter", "tariff", "period")
+
     def __init__(self, consumer, meter, tariff, period):
         self.consumer = consumer
         self.meter = meter
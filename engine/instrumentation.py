@@ -0,0 +1,129 @@
+import time
+import tracemalloc
+
+
+class BillingMetrics:
+    """
+    Opt-in instrumentation for the billing paths.
+
+    Engines take metrics=None by default and then do no timing work at
+    all. When given a BillingMetrics they record:
+
+    stages   : wall time per named stage (calls, total, max) and, with
+               track_allocations=True, net bytes allocated per stage
+    counters : event counts (bills, ledger rows, negative wallets, ...)
+
+    summary() returns a dict; prometheus() the text exposition format.
+    """
+
+    def __init__(self, track_allocations=False):
+        self.track_allocations = track_allocations
+        self.stages = {}        # name -> [calls, seconds, max seconds, bytes]
+        self.counters = {}
+        self._started_tracing = False
+
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def timer(self):
+        return StageTimer(self)
+
+    def observe(self, stage, seconds, allocated=0):
+        s = self.stages.get(stage)
+        if s is None:
+            self.stages[stage] = [1, seconds, seconds, allocated]
+        else:
+            s[0] += 1
+            s[1] += seconds
+            if seconds > s[2]:
+                s[2] = seconds
+            s[3] += allocated
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        self.stages.clear()
+        self.counters.clear()
+
+    def close(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def summary(self):
+        total = sum(s[1] for s in self.stages.values()) or 1.0
+        return {
+            "stages": {
+                name: {
+                    "calls": calls,
+                    "totalMs": round(seconds * 1000, 3),
+                    "meanUs": round(seconds / calls * 1e6, 3),
+                    "maxUs": round(worst * 1e6, 3),
+                    "share": round(seconds / total, 4),
+                    "allocatedBytes": allocated
+                }
+                for name, (calls, seconds, worst, allocated) in self.stages.items()
+            },
+            "counters": dict(self.counters)
+        }
+
+    def prometheus(self, prefix="voltengine"):
+        lines = [
+            "# HELP %s_stage_seconds_total Wall time spent per billing stage." % prefix,
+            "# TYPE %s_stage_seconds_total counter" % prefix,
+        ]
+        for name, s in self.stages.items():
+            lines.append('%s_stage_seconds_total{stage="%s"} %.9f' % (prefix, name, s[1]))
+
+        lines += [
+            "# HELP %s_stage_calls_total Executions per billing stage." % prefix,
+            "# TYPE %s_stage_calls_total counter" % prefix,
+        ]
+        for name, s in self.stages.items():
+            lines.append('%s_stage_calls_total{stage="%s"} %d' % (prefix, name, s[0]))
+
+        lines += [
+            "# HELP %s_stage_seconds_max Slowest single execution per stage." % prefix,
+            "# TYPE %s_stage_seconds_max gauge" % prefix,
+        ]
+        for name, s in self.stages.items():
+            lines.append('%s_stage_seconds_max{stage="%s"} %.9f' % (prefix, name, s[2]))
+
+        if self.track_allocations:
+            lines += [
+                "# HELP %s_stage_allocated_bytes_total Net bytes allocated per stage." % prefix,
+                "# TYPE %s_stage_allocated_bytes_total counter" % prefix,
+            ]
+            for name, s in self.stages.items():
+                lines.append('%s_stage_allocated_bytes_total{stage="%s"} %d' % (prefix, name, s[3]))
+
+        for name, value in self.counters.items():
+            lines.append("# TYPE %s_%s_total counter" % (prefix, name))
+            lines.append("%s_%s_total %d" % (prefix, name, value))
+
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """
+    Lap timer for one pass through an engine: lap(name) attributes the
+    time (and allocation) since the previous lap to stage `name`.
+    """
+
+    __slots__ = ("metrics", "last", "memory")
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.memory = tracemalloc.get_traced_memory()[0] if metrics.track_allocations else 0
+        self.last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        allocated = 0
+        if self.metrics.track_allocations:
+            memory = tracemalloc.get_traced_memory()[0]
+            allocated, self.memory = memory - self.memory, memory
+        self.metrics.observe(stage, now - self.last, allocated)
+        self.last = time.perf_counter()
@@ -0,0 +1,21 @@
+import importlib
+
+
+class LazyModule:
+    """
+    Module stand-in that imports the real module on first attribute
+    access, e.g. np = LazyModule("numpy"). Keeps heavy optional
+    dependencies off the import path of code that never touches them.
+    """
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        # Later lookups hit the instance dict directly
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return "<lazy module %r>" % self._name
@@ -0,0 +1,265 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+from billing.prepaid_daily_batch import PrepaidDailyBatchBilling
+
+
+STATE_COLUMNS = ("wallet_balance", "arrear_balance", "load_kw", "installment_daily", "tariff_ids")
+
+
+def _shard_worker(conn, tariffs):
+    """
+    One resident shard: holds its consumers' columns between runs and
+    receives only the day's meter columns. Tariffs arrive once, at start.
+    A bill is held as pending until the coordinator sends "commit" (every
+    shard succeeded) or "rollback" (some shard failed).
+    """
+    biller = PrepaidDailyBatchBilling(tariffs)
+    state = None
+    pending = None
+
+    while True:
+        command, payload = conn.recv()
+        if command == "close":
+            break
+        try:
+            if command == "load":
+                state = payload
+                reply = None
+            elif command == "bill":
+                daily_units, max_demand_kw, period = payload
+                result = biller.run(
+                    daily_units=daily_units, max_demand_kw=max_demand_kw,
+                    period=period, **state)
+                pending = (result["walletBalance"], result["arrearBalance"])
+                reply = (result, biller.ledger_rows(result))
+            elif command == "commit":
+                state["wallet_balance"], state["arrear_balance"] = pending
+                pending = reply = None
+            elif command == "rollback":
+                pending = reply = None
+            elif command == "state":
+                reply = state
+            else:
+                raise ValueError("Unknown command %r" % (command,))
+            conn.send((True, reply))
+        except Exception as exc:
+            conn.send((False, exc))
+    conn.close()
+
+
+class ParallelBillingRunner:
+    """
+    Runs the fleet daily bill across CPU cores.
+
+    Consumers are split into one shard per worker process by integer row
+    id (e.g. ConsumerTable rows): shard = row % workers. load() sends each
+    worker its shard's balances, load and tariff ids once; they stay
+    resident, and each run() ships only the day's units and demand and
+    writes the billed balances back inside the worker. Results and ledger
+    rows are merged back in load order, so the output does not depend on
+    worker count or completion order.
+
+    A day is applied on every shard or on none: if any worker fails, the
+    others roll back and run() raises the first error. A worker that dies
+    or a failed load() marks the runner broken; it then refuses every
+    call until it is closed and replaced.
+    """
+
+    def __init__(self, tariffs, workers=None):
+        self.tariffs = list(tariffs)
+        self.workers = workers or os.cpu_count() or 1
+        self.size = 0
+        self._shards = []       # (connection, rows in load order)
+        self._processes = []
+        self._broken = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        for conn, _ in self._shards:
+            try:
+                conn.send(("close", None))
+            except OSError:
+                pass                        # worker already gone
+            conn.close()
+        for process in self._processes:
+            process.join()
+        self._shards = []
+        self._processes = []
+
+    @staticmethod
+    def shard_of(rows, shards):
+        return np.asarray(rows, dtype=np.intp) % shards
+
+    @classmethod
+    def from_table(cls, table, tariff_ids, tariffs, workers=None):
+        """Runner loaded with every row of a ConsumerTable."""
+        runner = cls(tariffs, workers)
+        rows = np.arange(len(table))
+        runner.load(tariff_ids=tariff_ids, rows=rows, **table.gather(rows))
+        return runner
+
+    def load(
+        self,
+        wallet_balance,
+        arrear_balance,
+        load_kw,
+        installment_daily,
+        tariff_ids,
+        rows=None
+    ):
+        """
+        Distribute the fleet state to the workers. rows are the integer
+        ids used for sharding (default 0..n-1).
+        """
+        columns = {
+            "wallet_balance": np.asarray(wallet_balance, dtype=np.float64),
+            "arrear_balance": np.asarray(arrear_balance, dtype=np.float64),
+            "load_kw": np.asarray(load_kw, dtype=np.float64),
+            "installment_daily": np.asarray(installment_daily, dtype=np.float64),
+            "tariff_ids": np.asarray(tariff_ids, dtype=np.intp),
+        }
+        n = len(columns["wallet_balance"])
+        rows = np.arange(n) if rows is None else rows
+
+        shard = self.shard_of(rows, self.workers)
+        order = np.argsort(shard, kind="stable")
+        bounds = np.searchsorted(shard[order], np.arange(self.workers + 1))
+
+        self._check()
+        self._start()
+        self.size = n
+        shards = []
+        for s, (conn, _) in enumerate(self._shards):
+            positions = order[bounds[s]:bounds[s + 1]]
+            conn.send(("load", {name: col[positions] for name, col in columns.items()}))
+            shards.append((conn, positions))
+        self._shards = shards
+
+        error = self._first_error(self._gather())
+        if error is not None:
+            # Some shards hold the new fleet, some the old one
+            self._broken = error
+            raise error
+
+    def run(self, daily_units, max_demand_kw, period):
+        """
+        Bill one day for the loaded fleet (inputs in load order). The
+        workers keep the billed wallet and arrear balances for the next
+        run. Returns (result columns, ledger rows) in load order.
+        """
+        self._check()
+        if not self._shards or self._shards[0][1] is None:
+            raise RuntimeError("load() the fleet before run()")
+
+        units = np.asarray(daily_units, dtype=np.float64)
+        demand = np.asarray(max_demand_kw, dtype=np.float64)
+        for conn, positions in self._shards:
+            conn.send(("bill", (units[positions], demand[positions], period)))
+
+        # Every reply is read before deciding, so no pipe keeps a stale one
+        replies = self._gather()
+        error = self._first_error(replies)
+        self._broadcast("rollback" if error is not None else "commit")
+        if error is not None:
+            raise error
+
+        # -----------------------------
+        # Merge (load order, not completion order)
+        # -----------------------------
+        merged = None
+        ledger_parts = []
+
+        for (conn, positions), (_, (result, ledger_rows)) in zip(self._shards, replies):
+            if len(positions) == 0:
+                continue
+
+            if merged is None:
+                merged = {key: np.empty(self.size, dtype=arr.dtype) for key, arr in result.items()}
+            for key, arr in result.items():
+                merged[key][positions] = arr
+
+            ledger_rows["row"] = positions[ledger_rows["row"]]
+            ledger_parts.append(ledger_rows)
+
+        if merged is None:
+            return {}, {}
+
+        ledger = {
+            key: np.concatenate([part[key] for part in ledger_parts])
+            for key in ledger_parts[0]
+        }
+        # Rows are consumer-major; a stable sort on the global row keeps
+        # each consumer's entries in posting order.
+        restore = np.argsort(ledger["row"], kind="stable")
+        ledger = {key: arr[restore] for key, arr in ledger.items()}
+
+        return merged, ledger
+
+    def state(self):
+        """Resident columns gathered back in load order."""
+        self._check()
+        merged = {name: np.empty(self.size, dtype=np.intp if name == "tariff_ids" else np.float64)
+                  for name in STATE_COLUMNS}
+        for conn, positions in self._shards:
+            conn.send(("state", None))
+
+        replies = self._gather()
+        error = self._first_error(replies)
+        if error is not None:
+            raise error
+        for (conn, positions), (_, state) in zip(self._shards, replies):
+            for name, col in state.items():
+                merged[name][positions] = col
+        return merged
+
+    def _start(self):
+        if self._processes:
+            return
+        for _ in range(self.workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_shard_worker, args=(child, self.tariffs), daemon=True)
+            process.start()
+            child.close()
+            self._processes.append(process)
+            self._shards.append((parent, None))
+
+    def _check(self):
+        if self._broken is not None:
+            raise RuntimeError("ParallelBillingRunner is broken (%r); close it and start a new one"
+                               % (self._broken,))
+
+    def _broadcast(self, command):
+        for conn, _ in self._shards:
+            conn.send((command, None))
+        error = self._first_error(self._gather())
+        if error is not None:
+            self._broken = error
+            raise error
+
+    def _gather(self):
+        """One (ok, reply) per shard, reading every pipe even after a failure."""
+        replies = []
+        for conn, _ in self._shards:
+            try:
+                replies.append(conn.recv())
+            except (EOFError, OSError) as exc:
+                self._broken = exc
+                replies.append((False, RuntimeError("billing worker died: %r" % (exc,))))
+        return replies
+
+    @staticmethod
+    def _first_error(replies):
+        for ok, reply in replies:
+            if not ok:
+                return reply
+        return None
@@ -0,0 +1,227 @@
+import csv
+import json
+
+import numpy as np
+
+
+# Column name -> dtype of a parsed meter-read chunk. Optional columns
+# (meter change, pre-computed daily units) may be absent from a dump.
+READ_COLUMNS = {
+    "consumer_id": object,
+    "date": object,
+    "reading": np.float64,
+    "max_demand_kw": np.float64,
+    "meter_change": np.bool_,
+    "new_meter_reading": np.float64,
+    "daily_units": np.float64,
+}
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+def _to_float(value):
+    """A blank or unparseable value becomes NaN, i.e. a missing reading."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class MeterReadReader:
+    """
+    Generators over large AMI read dumps. Each yields columnar chunks
+    (dict of numpy arrays) of at most chunk_size rows, so memory stays
+    bounded by the chunk size, not the file size.
+    """
+
+    @staticmethod
+    def csv(source, chunk_size=100_000):
+        with MeterReadReader._open(source) as f:
+            yield from MeterReadReader._chunks(csv.DictReader(f), chunk_size)
+
+    @staticmethod
+    def jsonl(source, chunk_size=100_000):
+        with MeterReadReader._open(source) as f:
+            rows = (json.loads(line) for line in f if line.strip())
+            yield from MeterReadReader._chunks(rows, chunk_size)
+
+    @staticmethod
+    def _open(source):
+        if hasattr(source, "read"):
+            return _Borrowed(source)
+        return open(source, newline="", encoding="utf-8")
+
+    @staticmethod
+    def _chunks(rows, chunk_size):
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) == chunk_size:
+                yield MeterReadReader._columnar(buffer)
+                buffer = []
+        if buffer:
+            yield MeterReadReader._columnar(buffer)
+
+    @staticmethod
+    def _columnar(rows):
+        # A column the dump declares is emitted even when every value in
+        # this chunk is blank, so a chunk's layout never depends on its data
+        declared = [c for c in READ_COLUMNS if any(c in row for row in rows)]
+        chunk = {}
+
+        for name in declared:
+            values = [row.get(name) for row in rows]
+            dtype = READ_COLUMNS[name]
+
+            if dtype is np.bool_:
+                chunk[name] = np.array([_to_bool(v) for v in values], dtype=bool)
+            elif dtype is object:
+                chunk[name] = np.array(values, dtype=object)
+            else:
+                chunk[name] = np.fromiter(
+                    (_to_float(v) for v in values), dtype=dtype, count=len(values))
+
+        return chunk
+
+
+class _Borrowed:
+    """Context manager that leaves a caller-owned file object open."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def __enter__(self):
+        return self.f
+
+    def __exit__(self, *exc):
+        return False
+
+
+class MeterReadValidator:
+    """
+    Turns cumulative register reads into daily units, applying the same
+    checks as the simulator's PrepaidDailyBilling.run:
+
+    - a read below the previous read is rejected ("Negative Consumption")
+      and does not move the consumer's last reading;
+    - a blank or unparseable read is rejected ("Missing Reading") and
+      likewise leaves the last reading where it was;
+    - on a meter changeover the final read of the old meter is billed
+      and the new meter's initial read becomes the last reading.
+
+    The first read seen for an unknown consumer only sets the baseline.
+    """
+
+    def __init__(self, last_readings=None):
+        self.last_readings = dict(last_readings or {})
+
+    def validate(self, chunk):
+        """
+        Returns (valid, rejects): valid is the chunk restricted to
+        billable rows with a "daily_units" column added, rejects is a
+        list of (row_position, consumer_id, date, reason).
+        """
+        if "reading" not in chunk:
+            return self._validate_units(chunk)
+
+        ids = chunk["consumer_id"]
+        reading = chunk["reading"]
+        n = len(reading)
+        if n == 0:
+            return dict(chunk, daily_units=np.empty(0)), []
+
+        change = chunk.get("meter_change", np.zeros(n, dtype=bool))
+        new_read = chunk.get("new_meter_reading", np.full(n, np.nan))
+        # Register value the next read is measured against
+        closing = np.where(change & ~np.isnan(new_read), new_read, reading)
+
+        # Group each consumer's rows together, keeping file order
+        order = np.argsort(ids.astype(str), kind="stable")
+        sorted_ids = ids[order]
+        first = np.ones(n, dtype=bool)
+        first[1:] = sorted_ids[1:] != sorted_ids[:-1]
+
+        opening = np.array(
+            [self.last_readings.get(cid, np.nan) for cid in sorted_ids[first]],
+            dtype=np.float64)
+
+        group = np.cumsum(first) - 1
+        missing = np.isnan(reading[order])
+        active = ~missing                   # in sorted order
+        while True:
+            previous = self._previous(closing[order], active, first, opening)
+            units = reading[order] - previous
+            negative = active & (units < 0)
+            if not negative.any():
+                break
+            # Only the earliest negative read per consumer is certain;
+            # later ones are re-measured once it stops being the baseline.
+            earliest = np.full(group[-1] + 1, n)
+            np.minimum.at(earliest, group[negative], np.flatnonzero(negative))
+            active[earliest[earliest < n]] = False
+
+        rejected = ~active
+        baseline = active & np.isnan(previous)
+        billable = active & ~baseline
+
+        # Carry the closing register value per consumer forward
+        last_active = np.full(group[-1] + 1, -1)
+        np.maximum.at(last_active, group[active], np.flatnonzero(active))
+        sorted_closing = closing[order]
+        for pos in last_active[last_active >= 0].tolist():
+            self.last_readings[sorted_ids[pos]] = float(sorted_closing[pos])
+
+        rejects = [
+            (int(order[i]), ids[order[i]], chunk["date"][order[i]],
+             "Missing Reading" if missing[i] else "Negative Consumption")
+            for i in np.flatnonzero(rejected)
+        ]
+
+        keep = np.sort(order[billable])
+        valid = {name: col[keep] for name, col in chunk.items()}
+        units_by_row = np.empty(n)
+        units_by_row[order] = units
+        valid["daily_units"] = units_by_row[keep]
+
+        return valid, rejects
+
+    @staticmethod
+    def _previous(closing, active, first, opening):
+        """
+        Previous active closing read for each (sorted) row, falling back
+        to the consumer's opening read; NaN when there is none.
+        """
+        n = len(closing)
+        group = np.cumsum(first) - 1
+
+        # Index of the latest active row strictly before i in the group
+        marker = np.where(active, np.arange(n), -1)
+        running = np.maximum.accumulate(marker)
+        prev_idx = np.full(n, -1)
+        prev_idx[1:] = running[:-1]
+
+        group_start = np.flatnonzero(first)[group]
+        has_prev = prev_idx >= group_start
+
+        return np.where(
+            has_prev,
+            closing[np.maximum(prev_idx, 0)],
+            opening[group]
+        )
+
+    @staticmethod
+    def _validate_units(chunk):
+        units = chunk["daily_units"]
+        negative = ~(units >= 0)
+
+        rejects = [
+            (int(i), chunk["consumer_id"][i], chunk["date"][i], "Negative Consumption")
+            for i in np.flatnonzero(negative)
+        ]
+        valid = {name: col[~negative] for name, col in chunk.items()}
+
+        return valid, rejects
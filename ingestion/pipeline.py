@@ -0,0 +1,230 @@
+import csv
+from contextlib import nullcontext
+
+import numpy as np
+
+from accounting.money import round2
+from engine.columnar_sink import ColumnarSink
+from ingestion.meter_reads import MeterReadValidator
+from models.consumer_table import ConsumerTable
+from models.ledger import LEDGER_TYPES
+
+
+def occurrence_waves(ids):
+    """
+    Yields row positions in waves such that each id appears at most once
+    per wave, keeping the order of repeated ids (1st occurrences, then
+    2nd occurrences, ...).
+    """
+    n = len(ids)
+    if n == 0:
+        return
+
+    order = np.argsort(ids.astype(str), kind="stable")
+    sorted_ids = ids[order]
+    first = np.ones(n, dtype=bool)
+    first[1:] = sorted_ids[1:] != sorted_ids[:-1]
+
+    # Occurrence number of each row within its consumer
+    starts = np.flatnonzero(first)
+    rank = np.empty(n, dtype=np.intp)
+    rank[order] = np.arange(n) - starts[np.cumsum(first) - 1]
+
+    for r in range(rank.max() + 1):
+        yield np.flatnonzero(rank == r)
+
+
+class StreamingBillingPipeline:
+    """
+    Streams validated meter-read chunks through PrepaidDailyBatchBilling
+    and yields columnar ledger rows chunk by chunk.
+
+    consumers : ConsumerTable, or mapping consumer_id -> Consumer
+                (state is written back either way)
+    tariff_of : mapping consumer_id -> tariff id of the batch biller; rows
+                of a consumer without one are rejected, not billed
+    locks     : optional operations.locking.ConsumerLocks; each batch holds
+                its consumers' stripes from state read to write-back, so
+                concurrent recharges are never lost
+    metrics   : optional engine.instrumentation.BillingMetrics; times the
+                validate / bill / ledger stages per chunk and counts
+                bills, ledger rows, rejects and negative wallets
+    """
+
+    def __init__(
+        self,
+        biller,
+        consumers,
+        tariff_of,
+        period,
+        validator=None,
+        ledger=None,
+        on_reject=None,
+        locks=None,
+        metrics=None
+    ):
+        self.biller = biller
+        self.consumers = consumers
+        self.tariff_of = tariff_of
+        self.period = period
+        self.validator = validator or MeterReadValidator()
+        self.ledger = ledger
+        self.on_reject = on_reject
+        self.locks = locks
+        self.metrics = metrics
+        self.billed = 0
+        self.rejected = 0
+
+    def run(self, chunks):
+        for chunk in chunks:
+            timer = self.metrics.timer() if self.metrics is not None else None
+            valid, rejects = self.validator.validate(chunk)
+            self._reject(rejects)
+            if timer:
+                timer.lap("validate")
+
+            # A chunk can hold several days for one consumer; bill them
+            # in waves so each consumer appears at most once per batch.
+            for rows in occurrence_waves(valid["consumer_id"]):
+                out = self._bill(valid, rows, timer)
+                if out is not None:
+                    yield out
+
+    def _bill(self, valid, rows, timer=None):
+        ids = valid["consumer_id"][rows]
+        table = self.consumers if isinstance(self.consumers, ConsumerTable) else None
+
+        if table is not None:
+            table_rows = table.rows_for(ids)
+            known = table_rows >= 0
+        else:
+            table_rows = None
+            known = np.fromiter((cid in self.consumers for cid in ids), dtype=bool, count=len(ids))
+
+        if not known.all():
+            self._reject([
+                (int(r), cid, valid["date"][r], "Unknown Consumer")
+                for r, cid in zip(rows[~known], ids[~known])
+            ])
+            rows, ids = rows[known], ids[known]
+            if table_rows is not None:
+                table_rows = table_rows[known]
+
+        tariff_ids = np.fromiter((self.tariff_of.get(cid, -1) for cid in ids), np.intp, len(ids))
+        priced = tariff_ids >= 0
+        if not priced.all():
+            self._reject([
+                (int(r), cid, valid["date"][r], "No Tariff For Consumer")
+                for r, cid in zip(rows[~priced], ids[~priced])
+            ])
+            rows, ids, tariff_ids = rows[priced], ids[priced], tariff_ids[priced]
+            if table_rows is not None:
+                table_rows = table_rows[priced]
+        if len(rows) == 0:
+            return None
+
+        guard = nullcontext() if self.locks is None else self.locks.hold_many(ids)
+        with guard:
+            result = self._settle(valid, rows, ids, tariff_ids, table, table_rows)
+        if timer:
+            timer.lap("bill")
+
+        ledger_rows = self.biller.ledger_rows(result)
+        source = ledger_rows.pop("row")
+        ledger_rows["consumerId"] = ids[source]
+        ledger_rows["date"] = valid["date"][rows][source]
+
+        if self.ledger is not None:
+            self.ledger.record_batch(
+                ledger_rows["date"].tolist(),
+                ledger_rows["type"],
+                ledger_rows["amount"],
+                ledger_rows["balance"],
+                ledger_rows["consumerId"].tolist()
+            )
+
+        self.billed += len(rows)
+        if timer:
+            timer.lap("ledger")
+            self.metrics.count("bills", len(rows))
+            self.metrics.count("ledger_rows", len(source))
+            self.metrics.count("negative_wallets", int((result["walletBalance"] < 0).sum()))
+        return ledger_rows
+
+    def _settle(self, valid, rows, ids, tariff_ids, table, table_rows):
+        """Read state, bill and write state back for one wave."""
+        n = len(rows)
+        if table is not None:
+            state = table.gather(table_rows)
+        else:
+            consumers = [self.consumers[cid] for cid in ids]
+            state = {
+                "wallet_balance": np.fromiter((c.wallet_balance for c in consumers), np.float64, n),
+                "arrear_balance": np.fromiter((c.arrear_balance for c in consumers), np.float64, n),
+                "load_kw": np.fromiter((c.load_kw for c in consumers), np.float64, n),
+                "installment_daily": np.fromiter(
+                    (c.installment["daily"] if c.installment else 0 for c in consumers),
+                    np.float64, n),
+            }
+
+        max_demand = valid.get("max_demand_kw")
+        result = self.biller.run(
+            daily_units=valid["daily_units"][rows],
+            max_demand_kw=np.zeros(n) if max_demand is None else max_demand[rows],
+            tariff_ids=tariff_ids,
+            period=self.period,
+            **state
+        )
+
+        if table is not None:
+            table.apply(table_rows, result)
+        else:
+            wallets = result["walletBalance"].tolist()
+            arrears = result["arrearBalance"].tolist()
+            for c, wallet, arrear in zip(consumers, wallets, arrears):
+                c.wallet_balance = wallet
+                c.arrear_balance = arrear
+
+        return result
+
+    def _reject(self, rejects):
+        self.rejected += len(rejects)
+        if self.metrics is not None and rejects:
+            self.metrics.count("rejects", len(rejects))
+        if self.on_reject is not None:
+            for reject in rejects:
+                self.on_reject(*reject)
+
+    @staticmethod
+    def write_csv(ledger_chunks, target):
+        """Stream ledger row chunks to a CSV file without holding them."""
+        with open(target, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["consumerId", "date", "type", "amount", "balance"])
+
+            for rows in ledger_chunks:
+                types = np.asarray(LEDGER_TYPES, dtype=object)[rows["type"]]
+                writer.writerows(zip(
+                    rows["consumerId"].tolist(),
+                    rows["date"].tolist(),
+                    types.tolist(),
+                    round2(rows["amount"]).tolist(),
+                    round2(rows["balance"]).tolist()
+                ))
+
+    @staticmethod
+    def write_columnar(ledger_chunks, target, format=None):
+        """
+        Stream ledger row chunks to Parquet / Arrow IPC (or .npy row
+        groups without pyarrow), one row group per chunk.
+        """
+        with ColumnarSink.ledger_sink(target, format) as sink:
+            for rows in ledger_chunks:
+                sink.write({
+                    "consumerId": rows["consumerId"],
+                    "date": rows["date"],
+                    "type": rows["type"],
+                    "amount": round2(rows["amount"]),
+                    "balance": round2(rows["balance"])
+                })
+        return sink.rows
@@ -1,4 +1,12 @@
 class Consumer:
+    __slots__ = (
+        "consumer_id",
+        "wallet_balance",
+        "arrear_balance",
+        "load_kw",
+        "installment"
+    )
+
     def __init__(
         self,
         consumer_id,
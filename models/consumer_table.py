@@ -0,0 +1,159 @@
+import numpy as np
+
+
+class ConsumerTable:
+    """
+    Struct-of-arrays store for a large consumer fleet.
+
+    Balances and load live in float64 columns; row(i) / get(consumer_id)
+    hand out ConsumerRow views with the Consumer attributes, so scalar
+    operations (RechargeOperation.apply, PrepaidDailyBilling.run, ...)
+    work on a row without materialising a Consumer object.
+    """
+
+    COLUMNS = ("wallet_balance", "arrear_balance", "load_kw", "installment_daily")
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.ids = []
+        self.index = {}             # consumer_id -> row
+        self.installments = {}      # row -> installment dict (sparse)
+        self._columns = {
+            name: np.zeros(capacity, dtype=np.float64) for name in self.COLUMNS
+        }
+
+    @classmethod
+    def from_consumers(cls, consumers):
+        consumers = list(consumers)
+        table = cls(capacity=max(len(consumers), 16))
+        for c in consumers:
+            table.add(c.consumer_id, c.wallet_balance, c.arrear_balance,
+                      c.load_kw, c.installment)
+        return table
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, consumer_id):
+        return consumer_id in self.index
+
+    def add(self, consumer_id, wallet_balance, arrear_balance=0, load_kw=1.0, installment=None):
+        if consumer_id in self.index:
+            raise ValueError("Consumer %r already in table" % (consumer_id,))
+
+        if self.size == len(self._columns["wallet_balance"]):
+            self._grow()
+
+        row = self.size
+        cols = self._columns
+        cols["wallet_balance"][row] = wallet_balance
+        cols["arrear_balance"][row] = arrear_balance
+        cols["load_kw"][row] = load_kw
+
+        self.ids.append(consumer_id)
+        self.index[consumer_id] = row
+        self.size += 1
+        self.set_installment(row, installment)
+
+        return row
+
+    def column(self, name):
+        """Writable view of one column over the stored consumers."""
+        return self._columns[name][:self.size]
+
+    def row(self, i):
+        return ConsumerRow(self, i)
+
+    def get(self, consumer_id):
+        return ConsumerRow(self, self.index[consumer_id])
+
+    def __getitem__(self, consumer_id):
+        return self.get(consumer_id)
+
+    def rows_for(self, consumer_ids):
+        """Row numbers for consumer_ids; -1 where the id is unknown."""
+        index = self.index
+        return np.fromiter(
+            (index.get(cid, -1) for cid in consumer_ids),
+            dtype=np.intp,
+            count=len(consumer_ids)
+        )
+
+    def set_installment(self, row, installment):
+        if installment:
+            self.installments[row] = installment
+            self._columns["installment_daily"][row] = installment["daily"]
+        else:
+            self.installments.pop(row, None)
+            self._columns["installment_daily"][row] = 0.0
+
+    def gather(self, rows):
+        """Columns for PrepaidDailyBatchBilling.run, for the given rows."""
+        cols = self._columns
+        return {
+            "wallet_balance": cols["wallet_balance"][rows],
+            "arrear_balance": cols["arrear_balance"][rows],
+            "load_kw": cols["load_kw"][rows],
+            "installment_daily": cols["installment_daily"][rows],
+        }
+
+    def apply(self, rows, result):
+        """Write a batch billing result back to the given rows."""
+        self._columns["wallet_balance"][rows] = result["walletBalance"]
+        self._columns["arrear_balance"][rows] = result["arrearBalance"]
+
+    def nbytes(self):
+        return sum(col.nbytes for col in self._columns.values())
+
+    def _grow(self):
+        capacity = max(2 * len(self._columns["wallet_balance"]), 16)
+        for name, col in self._columns.items():
+            grown = np.zeros(capacity, dtype=col.dtype)
+            grown[:self.size] = col[:self.size]
+            self._columns[name] = grown
+
+
+class ConsumerRow:
+    """Lightweight view of one ConsumerTable row, shaped like Consumer."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    @property
+    def consumer_id(self):
+        return self._table.ids[self._row]
+
+    @property
+    def wallet_balance(self):
+        return float(self._table._columns["wallet_balance"][self._row])
+
+    @wallet_balance.setter
+    def wallet_balance(self, value):
+        self._table._columns["wallet_balance"][self._row] = value
+
+    @property
+    def arrear_balance(self):
+        return float(self._table._columns["arrear_balance"][self._row])
+
+    @arrear_balance.setter
+    def arrear_balance(self, value):
+        self._table._columns["arrear_balance"][self._row] = value
+
+    @property
+    def load_kw(self):
+        return float(self._table._columns["load_kw"][self._row])
+
+    @load_kw.setter
+    def load_kw(self, value):
+        self._table._columns["load_kw"][self._row] = value
+
+    @property
+    def installment(self):
+        return self._table.installments.get(self._row)
+
+    @installment.setter
+    def installment(self, value):
+        self._table.set_installment(self._row, value)
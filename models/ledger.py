@@ -1,4 +1,18 @@
+# Entry types written by the billing engines, in posting order.
+# Position in this tuple is the entry type code used by columnar ledgers.
+LEDGER_TYPES = (
+    "ENERGY",
+    "FIXED",
+    "DUTY",
+    "DPS",
+    "INSTALLMENT_RECOVERY",
+    "EXCESS_DEMAND_PENALTY",
+)
+
+
 class LedgerEntry:
+    __slots__ = ("date", "entry_type", "amount", "balance")
+
     def __init__(self, date, entry_type, amount, balance):
         self.date = date
         self.entry_type = entry_type
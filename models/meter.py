@@ -1,4 +1,8 @@
 class Meter:
-    def __init__(self, daily_units,max_demand_kw):
+    __slots__ = ("daily_units", "max_demand_kw", "load_profile", "kvah")
+
+    def __init__(self, daily_units,max_demand_kw, load_profile=None, kvah=None):
         self.daily_units = daily_units
         self.max_demand_kw = max_demand_kw
+        self.load_profile = load_profile    # kWh per interval (ToD billing)
+        self.kvah = kvah                    # Apparent energy (HT power factor)
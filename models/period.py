@@ -1,3 +1,5 @@
 class Period:
+    __slots__ = ("days",)
+
     def __init__(self, days=30):
         self.days = days
@@ -0,0 +1,163 @@
+import numpy as np
+
+from accounting.money import from_paise, to_paise_array
+
+
+class ArrearCatchUp:
+    """
+    Replay of N consecutive days of DPSCalculator.daily and
+    InstallmentEngine.daily_amount for a fleet of arrears.
+
+    totals() and daily() are closed-form projections in unrounded rupees:
+
+        dps_t   = a_t * q   if a_t > 0 else 0        (q = monthly_rate / 30)
+        a_t+1   = a_t + dps_t - installment
+
+    While the arrear stays positive this is a geometric recurrence, so
+    a_t = a0 * g^t - I * (g^t - 1) / q with g = 1 + q. Once it reaches
+    zero no more DPS accrues and only the installment keeps recovering.
+
+    PrepaidDailyBilling.run posts DPS in whole paise each day, which
+    breaks the geometric form, so the projections drift from the posted
+    amounts by rounding. daily_paise() is the exact replay that matches
+    the posted ledger.
+
+    All arguments broadcast, so a whole fleet is handled in one call.
+    """
+
+    @staticmethod
+    def totals(arrear, monthly_rate, installment_daily, days):
+        """
+        Returns dict with total "dps", total "installment", the final
+        "arrearBalance" and "dpsDays" (days on which DPS accrued).
+        """
+        a0, q, inst, days = np.broadcast_arrays(
+            np.asarray(arrear, dtype=np.float64),
+            np.asarray(monthly_rate, dtype=np.float64) / 30,
+            np.asarray(installment_daily, dtype=np.float64),
+            np.asarray(days, dtype=np.int64),
+        )
+
+        k = np.minimum(ArrearCatchUp._first_non_positive(a0, q, inst), days)
+        dps = ArrearCatchUp._dps_sum(a0, q, inst, k)
+
+        result = {
+            "dps": dps,
+            "installment": inst * days,
+            "arrearBalance": a0 + dps - inst * days,
+            "dpsDays": k,
+        }
+        if np.ndim(arrear) == 0 and np.ndim(installment_daily) == 0:
+            result = {key: value.item() for key, value in result.items()}
+        return result
+
+    @staticmethod
+    def daily(arrear, monthly_rate, installment_daily, days):
+        """
+        Per-day DPS and arrear (after installment) for `days` days, shape
+        (..., days). Meant for posting day-wise ledger entries.
+        """
+        a0 = np.asarray(arrear, dtype=np.float64)[..., None]
+        q = np.asarray(monthly_rate, dtype=np.float64)[..., None] / 30
+        inst = np.asarray(installment_daily, dtype=np.float64)[..., None]
+        t = np.arange(days)
+
+        # Opening arrear of each day under the geometric regime; DPS
+        # accrues while every opening balance so far has been positive
+        opening = ArrearCatchUp._closing_at(a0, q, inst, t)
+        accruing = np.logical_and.accumulate(opening > 0, axis=-1)
+
+        # Past the first non-positive day k it falls by I a day
+        k = accruing.sum(axis=-1, keepdims=True)
+        at_k = ArrearCatchUp._closing_at(a0, q, inst, k)
+        opening = np.where(accruing, opening, at_k - inst * (t - k))
+
+        dps = np.where(accruing, opening * q, 0.0)
+
+        return {
+            "dps": dps,
+            "arrearBalance": opening + dps - inst,
+        }
+
+    @staticmethod
+    def daily_paise(arrear_paise, monthly_rate, installment_paise, days):
+        """
+        Exact day-by-day replay in integer paise, with DPS rounded at each
+        posting as PrepaidDailyBilling.run does. Arguments broadcast over
+        consumers; results have shape (..., days). Each day is one
+        vectorised step over every consumer still accruing; once all
+        arrears are cleared the rest is a linear run of installments.
+        """
+        arrear, q, inst = np.broadcast_arrays(
+            np.asarray(arrear_paise, dtype=np.int64),
+            np.asarray(monthly_rate, dtype=np.float64) / 30,
+            np.asarray(installment_paise, dtype=np.int64),
+        )
+        arrear = arrear.copy()
+        dps = np.zeros(arrear.shape + (days,), dtype=np.int64)
+        closing = np.empty(arrear.shape + (days,), dtype=np.int64)
+
+        t = 0
+        while t < days:
+            accruing = arrear > 0
+            if not accruing.any():
+                break
+            dps[..., t] = np.where(accruing, to_paise_array(from_paise(arrear) * q), 0)
+            arrear += dps[..., t] - inst
+            closing[..., t] = arrear
+            t += 1
+
+        closing[..., t:] = arrear[..., None] - inst[..., None] * np.arange(1, days - t + 1)
+        return {"dps": dps, "arrearBalance": closing}
+
+    @staticmethod
+    def _expm1(q, t):
+        return np.expm1(t * np.log1p(q))
+
+    @staticmethod
+    def _ratio(growth, q, t):
+        # (g^t - 1) / q, with the q -> 0 limit t
+        safe_q = np.where(q > 0, q, 1.0)
+        return np.where(q > 0, growth / safe_q, t)
+
+    @staticmethod
+    def _closing_at(a0, q, inst, t):
+        growth = ArrearCatchUp._expm1(q, t)
+        return a0 + a0 * growth - inst * ArrearCatchUp._ratio(growth, q, t)
+
+    @staticmethod
+    def _first_non_positive(a0, q, inst):
+        """First day t whose opening arrear is <= 0 (huge if never)."""
+        never = np.iinfo(np.int64).max // 2
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Decreasing only while a0 < I / q; solve a_t = 0 for t
+            shrinking = (a0 > 0) & (inst > 0) & (q * a0 < inst)
+            ratio = inst / (inst - q * a0)
+            t_star = np.where(
+                q > 0,
+                np.log(ratio) / np.log1p(q),
+                a0 / np.where(inst > 0, inst, 1.0)
+            )
+
+        m = np.where(shrinking, np.ceil(np.nan_to_num(t_star)), never).astype(np.int64)
+        m = np.where(a0 <= 0, 0, m)
+
+        # Float guard: settle m so that a_(m-1) > 0 >= a_m exactly as the
+        # formula evaluates it
+        finite = shrinking & (m > 0)
+        for _ in range(2):
+            probe = np.where(finite, m, 1)
+            prev_pos = ArrearCatchUp._closing_at(a0, q, inst, probe - 1) > 0
+            m = np.where(finite & ~prev_pos & (m > 1), m - 1, m)
+            probe = np.where(finite, m, 1)
+            at_pos = ArrearCatchUp._closing_at(a0, q, inst, probe) > 0
+            m = np.where(finite & at_pos, m + 1, m)
+
+        return m
+
+    @staticmethod
+    def _dps_sum(a0, q, inst, k):
+        # q * sum_{t<k} a_t = a0 (g^k - 1) - I ((g^k - 1)/q - k)
+        growth = ArrearCatchUp._expm1(q, k)
+        return a0 * growth - inst * (ArrearCatchUp._ratio(growth, q, k) - k)
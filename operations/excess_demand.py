@@ -1,3 +1,6 @@
+from accounting.money import round_money
+
+
 class ExcessDemandPenalty:
 
     @staticmethod
@@ -13,4 +16,4 @@ class ExcessDemandPenalty:
         excess = recorded_demand - contract_demand
         penalty = excess * demand_rate * multiplier
 
-        return excess, round(penalty, 2)
+        return excess, round_money(penalty)
@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+
+from billing.prepaid_daily import PrepaidDailyBilling
+from operations.recharge import RechargeOperation
+
+
+MISS = object()
+
+
+class IdempotencyCache:
+    """
+    Bounded LRU cache of computed results with a time-to-live, for
+    answering redelivered requests without running them again.
+
+    maxsize : entries kept; the least recently used is dropped first
+    ttl     : seconds an entry stays valid after it is stored (None: no
+              expiry, only the size bound)
+
+    get() returns MISS when the key is absent or expired. Thread-safe.
+    """
+
+    def __init__(self, maxsize=100_000, ttl=24 * 3600, clock=time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()       # key -> (expires, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > self.clock()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return MISS
+
+    def put(self, key, value):
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def bill_key(consumer_id, date, daily_units, max_demand_kw):
+    """Idempotency key of one daily meter read."""
+    return ("bill", consumer_id, str(date), float(daily_units), float(max_demand_kw))
+
+
+def recharge_key(transaction_id):
+    return ("recharge", transaction_id)
+
+
+class IdempotentDailyBilling:
+    """
+    PrepaidDailyBilling that bills each (consumer, date, meter read) once.
+    A redelivered read returns the stored response; the wallet is not
+    charged again and nothing is reposted to the ledger or settlement.
+    A corrected read (different units or demand) is a new key and bills.
+
+    The lookup, the bill and the store run under the consumer's lock when
+    locks are given, so concurrent duplicates cannot both bill. Cached
+    responses are shared objects; do not mutate them.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else IdempotencyCache()
+        self.biller = PrepaidDailyBilling()
+
+    def run(self, consumer, meter, tariff, period, ledger, date,
+            settlement=None, locks=None, metrics=None):
+        if locks is not None:
+            with locks.hold(consumer.consumer_id):
+                return self.run(consumer, meter, tariff, period, ledger, date,
+                                settlement, metrics=metrics)
+
+        key = bill_key(consumer.consumer_id, date, meter.daily_units, meter.max_demand_kw)
+        response = self.cache.get(key)
+        if response is not MISS:
+            if metrics is not None:
+                metrics.count("duplicate_bills")
+            return response
+
+        response = self.biller.run(
+            consumer, meter, tariff, period, ledger, date, settlement, metrics=metrics)
+        self.cache.put(key, response)
+        return response
+
+
+class IdempotentRecharge:
+    """
+    RechargeOperation keyed by the payment gateway's transaction id: a
+    retried transaction returns the first response without crediting the
+    wallet again. Reusing a transaction id for a different consumer or
+    amount raises ValueError.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else IdempotencyCache()
+
+    def apply(self, consumer, amount, transaction_id, revise_installment=True, locks=None):
+        if locks is not None:
+            with locks.hold(consumer.consumer_id):
+                return self.apply(consumer, amount, transaction_id, revise_installment)
+
+        key = recharge_key(transaction_id)
+        request = (consumer.consumer_id, amount)
+
+        stored = self.cache.get(key)
+        if stored is not MISS:
+            if stored[0] != request:
+                raise ValueError("Transaction %r was already used for another recharge" % (transaction_id,))
+            return stored[1]
+
+        response = RechargeOperation.apply(consumer, amount, revise_installment)
+        self.cache.put(key, (request, response))
+        return response
@@ -1,3 +1,6 @@
+from accounting.money import from_paise, round_money, to_paise_array
+
+
 class InstallmentEngine:
 
     @staticmethod
@@ -6,11 +9,23 @@ class InstallmentEngine:
             return None
 
         return {
-            "total": round(arrear_balance, 2),
-            "daily": round(arrear_balance / tenure_days, 2),
+            "total": round_money(arrear_balance),
+            "daily": round_money(arrear_balance / tenure_days),
             "tenureDays": tenure_days
         }
 
+    @staticmethod
+    def revise_columns(arrear_balance, tenure_days=180):
+        """
+        revise() over an array of arrears: (total, daily) arrays, rounded
+        by the same posting rule. Rows with arrear <= 0 get no installment (0, 0).
+        """
+        owed = arrear_balance > 0
+        return (
+            from_paise(to_paise_array(arrear_balance) * owed),
+            from_paise(to_paise_array(arrear_balance / tenure_days) * owed)
+        )
+
     @staticmethod
     def daily_amount(installment):
         return installment["daily"] if installment else 0
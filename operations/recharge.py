@@ -3,7 +3,11 @@ from operations.installment import InstallmentEngine
 class RechargeOperation:
 
     @staticmethod
-    def apply(consumer, amount, revise_installment=True):
+    def apply(consumer, amount, revise_installment=True, locks=None):
+        if locks is not None:
+            with locks.hold(consumer.consumer_id):
+                return RechargeOperation.apply(consumer, amount, revise_installment)
+
         consumer.wallet_balance += amount
 
         if revise_installment:
@@ -1,4 +1,9 @@
 class WalletService:
-    def deduct(self, consumer, amount):
-        consumer.wallet_balance -= amount
-        return consumer.wallet_balance
+    def deduct(self, consumer, amount, locks=None):
+        if locks is None:
+            consumer.wallet_balance -= amount
+            return consumer.wallet_balance
+
+        with locks.hold(consumer.consumer_id):
+            consumer.wallet_balance -= amount
+            return consumer.wallet_balance
@@ -0,0 +1,284 @@
+import json
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from billing.prepaid_daily_batch import PrepaidDailyBatchBilling
+from ingestion.pipeline import occurrence_waves
+from operations.idempotency import MISS, bill_key, recharge_key
+from operations.installment import InstallmentEngine
+from service.batcher import MicroBatcher
+
+
+_DAILY_BILL = (
+    '{"billingType":"PREPAID_DAILY","consumerId":%s,"preview":%s,'
+    '"totalDeduction":%.2f,'
+    '"breakup":{"energy":%.2f,"fixed":%.2f,"duty":%.2f,"dps":%.2f,'
+    '"installment":%.2f,"excessDemand":{"excessKW":%.2f,"penalty":%.2f}},'
+    '"state":{"walletBalance":%.2f,"arrearBalance":%.2f}}'
+)
+
+_UNKNOWN_CONSUMER = b'{"error":"Unknown Consumer"}'
+_NO_TARIFF = b'{"error":"No Tariff For Consumer"}'
+_REUSED_TRANSACTION = b'{"error":"Transaction id already used for another recharge"}'
+
+
+class BillingService:
+    """
+    Batch entry points behind the HTTP layer. Each call takes a list of
+    requests and returns one (status, JSON bytes) pair per request, built
+    straight from the result columns.
+
+    table     : ConsumerTable holding the fleet state
+    tariffs   : tariff list for PrepaidDailyBatchBilling
+    tariff_of : mapping consumer_id -> tariff id
+    locks     : optional ConsumerLocks, for when other writers (a batch
+                run, another service) share the table
+    idempotency : optional IdempotencyCache; redelivered daily reads and
+                retried recharge transactions get the stored response
+                instead of being applied again
+    """
+
+    def __init__(self, table, tariffs, tariff_of, period, ledger=None, locks=None,
+                 idempotency=None):
+        self.table = table
+        self.biller = PrepaidDailyBatchBilling(tariffs)
+        self.tariff_of = tariff_of
+        self.period = period
+        self.ledger = ledger
+        self.locks = locks
+        self.idempotency = idempotency
+
+    def bill_daily(self, items):
+        """
+        items: (consumer_id, daily_units, max_demand_kw, date, preview)
+        A preview bills against the current state without writing it back.
+        With an idempotency cache, a read already billed (or repeated in
+        the same batch) returns the first response and is not re-billed.
+        """
+        if self.idempotency is None:
+            return self._bill_daily(items)
+
+        out = [None] * len(items)
+        pending, positions, keys = [], [], []
+        first, repeats = {}, {}
+        for i, item in enumerate(items):
+            consumer_id, units, demand, date, preview = item
+            key = None if preview else bill_key(consumer_id, date, units, demand)
+            if key is not None:
+                cached = self.idempotency.get(key)
+                if cached is not MISS:
+                    out[i] = cached
+                    continue
+                if key in first:
+                    repeats[i] = first[key]
+                    continue
+                first[key] = i
+
+            pending.append(item)
+            positions.append(i)
+            keys.append(key)
+
+        for i, key, response in zip(positions, keys, self._bill_daily(pending)):
+            out[i] = response
+            if key is not None and response[0] == 200:
+                self.idempotency.put(key, response)
+
+        for i, source in repeats.items():
+            out[i] = out[source]
+        return out
+
+    def _bill_daily(self, items):
+        out = [(404, _UNKNOWN_CONSUMER)] * len(items)
+        if not items:
+            return out
+
+        ids, units, demand, dates, preview = (np.asarray(c) for c in zip(*items))
+        ids = ids.astype(object)
+        table_rows = self.table.rows_for(ids)
+        # Resolve tariffs up front: a consumer without one fails alone
+        tariff_ids = np.fromiter(
+            map(self.tariff_of.get, ids.tolist(), [-1] * len(ids)), dtype=np.intp, count=len(ids))
+        billable = (table_rows >= 0) & (tariff_ids >= 0)
+        for i in np.flatnonzero((table_rows >= 0) & ~billable).tolist():
+            out[i] = (422, _NO_TARIFF)
+
+        # Repeated consumers in one batch are billed in arrival order
+        for wave in occurrence_waves(ids):
+            wave = wave[billable[wave]]
+            if len(wave) == 0:
+                continue
+
+            rows = table_rows[wave]
+            commit = ~preview[wave].astype(bool)
+
+            guard = nullcontext() if self.locks is None else self.locks.hold_many(ids[wave])
+            with guard:
+                result = self.biller.run(
+                    daily_units=units[wave].astype(np.float64),
+                    max_demand_kw=demand[wave].astype(np.float64),
+                    tariff_ids=tariff_ids[wave],
+                    period=self.period,
+                    **self.table.gather(rows)
+                )
+                if commit.any():
+                    self._commit(rows, ids[wave], dates[wave], result, commit)
+
+            columns = zip(
+                map(json.dumps, ids[wave].tolist()),
+                np.where(commit, "false", "true").tolist(),
+                *(result[key].tolist() for key in (
+                    "totalDeduction", "energy", "fixed", "duty", "dps",
+                    "installment", "excessKW", "excessPenalty",
+                    "walletBalance", "arrearBalance"))
+            )
+            for i, values in zip(wave.tolist(), columns):
+                out[i] = (200, (_DAILY_BILL % values).encode())
+
+        return out
+
+    def _commit(self, rows, ids, dates, result, commit):
+        committed = {key: value[commit] for key, value in result.items()}
+        self.table.apply(rows[commit], committed)
+
+        if self.ledger is not None:
+            ledger_rows = self.biller.ledger_rows(committed)
+            source = ledger_rows["row"]
+            self.ledger.record_batch(
+                dates[commit][source].tolist(),
+                ledger_rows["type"],
+                ledger_rows["amount"],
+                ledger_rows["balance"],
+                ids[commit][source].tolist()
+            )
+
+    def recharge(self, items):
+        """
+        items: (consumer_id, amount, revise_installment[, transaction_id])
+        Same result as RechargeOperation.apply per item, in arrival order,
+        applied to the table columns one occurrence wave at a time.
+        With an idempotency cache, a transaction id seen before returns the
+        first response without crediting again (409 if it was used for a
+        different consumer or amount).
+        """
+        out = [(404, _UNKNOWN_CONSUMER)] * len(items)
+        positions, keys = [], []
+        first, repeats = {}, {}
+        for i, (consumer_id, amount, revise_installment, *transaction) in enumerate(items):
+            key = None
+            if self.idempotency is not None and transaction and transaction[0] is not None:
+                key = recharge_key(transaction[0])
+                stored = self.idempotency.get(key)
+                if stored is not MISS:
+                    out[i] = stored[1] if stored[0] == (consumer_id, amount) else (409, _REUSED_TRANSACTION)
+                    continue
+                if key in first:
+                    repeats[i] = first[key]
+                    continue
+                first[key] = i
+
+            if consumer_id in self.table:
+                positions.append(i)
+                keys.append(key)
+
+        if positions:
+            responses = self._recharge([items[i] for i in positions])
+            for i, key, response in zip(positions, keys, responses):
+                out[i] = response
+                if key is not None:
+                    self.idempotency.put(key, (tuple(items[i][:2]), response))
+
+        for i, source in repeats.items():
+            same = tuple(items[i][:2]) == tuple(items[source][:2])
+            out[i] = out[source] if same else (409, _REUSED_TRANSACTION)
+        return out
+
+    def _recharge(self, items):
+        ids = np.array([item[0] for item in items], dtype=object)
+        amounts = np.array([item[1] for item in items], dtype=np.float64)
+        revise = np.array([bool(item[2]) for item in items])
+        rows = self.table.rows_for(ids)
+
+        wallet = self.table.column("wallet_balance")
+        arrear = self.table.column("arrear_balance")
+        installments = self.table.installments
+        balance = np.empty(len(items))
+        installment = [None] * len(items)
+
+        guard = nullcontext() if self.locks is None else self.locks.hold_many(ids)
+        with guard:
+            # Repeated consumers are credited in arrival order
+            for wave in occurrence_waves(ids):
+                wave_rows = rows[wave]
+                wallet[wave_rows] += amounts[wave]
+                balance[wave] = wallet[wave_rows]
+
+                revised = wave_rows[revise[wave]]
+                if len(revised):
+                    due = arrear[revised]
+                    total, daily = InstallmentEngine.revise_columns(due)
+                    for row, owed, t, d in zip(revised.tolist(), due.tolist(),
+                                               total.tolist(), daily.tolist()):
+                        self.table.set_installment(
+                            row, {"total": t, "daily": d, "tenureDays": 180} if owed > 0 else None)
+
+                for i, row in zip(wave.tolist(), wave_rows.tolist()):
+                    installment[i] = installments.get(row)
+
+        return [
+            (200, json.dumps({
+                "walletBalance": wallet_balance,
+                "installment": plan,
+                "consumerId": consumer_id
+            }).encode())
+            for consumer_id, wallet_balance, plan in zip(ids.tolist(), balance.tolist(), installment)
+        ]
+
+
+def create_app(service, max_batch=512, max_delay=0.002):
+    """
+    FastAPI app over a BillingService. Concurrent requests are
+    micro-batched; all batches run on one worker thread, so the fleet
+    state has a single writer and requests apply in arrival order.
+    """
+    from fastapi import FastAPI, Response
+    from pydantic import BaseModel
+
+    class DailyBillRequest(BaseModel):
+        consumerId: str
+        dailyUnits: float
+        maxDemandKw: float = 0.0
+        date: str
+        preview: bool = False
+
+    class RechargeRequest(BaseModel):
+        consumerId: str
+        amount: float
+        reviseInstallment: bool = True
+        transactionId: Optional[str] = None
+
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="billing-writer")
+    daily = MicroBatcher(service.bill_daily, writer, max_batch, max_delay)
+    recharges = MicroBatcher(service.recharge, writer, max_batch, max_delay)
+
+    app = FastAPI(title="VoltEngine Billing Service")
+
+    @app.on_event("shutdown")
+    def _shutdown():
+        writer.shutdown(wait=True)
+
+    @app.post("/v1/bills/daily")
+    async def bill_daily(req: DailyBillRequest):
+        status, body = await daily.submit(
+            (req.consumerId, req.dailyUnits, req.maxDemandKw, req.date, req.preview))
+        return Response(content=body, status_code=status, media_type="application/json")
+
+    @app.post("/v1/recharges")
+    async def recharge(req: RechargeRequest):
+        status, body = await recharges.submit(
+            (req.consumerId, req.amount, req.reviseInstallment, req.transactionId))
+        return Response(content=body, status_code=status, media_type="application/json")
+
+    return app
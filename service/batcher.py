@@ -0,0 +1,57 @@
+import asyncio
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests into batches for one vectorised call.
+
+    A batch is flushed when it reaches max_batch items or max_delay
+    seconds after its first item, whichever comes first. handler(items)
+    runs on `executor` and must return one result per item. With a
+    single-thread executor batches run strictly in arrival order.
+    """
+
+    def __init__(self, handler, executor=None, max_batch=512, max_delay=0.002):
+        self.handler = handler
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending = []
+        self._timer = None
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+
+        try:
+            results = await loop.run_in_executor(self.executor, self.handler, items)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,133 @@
+from bisect import bisect_left
+
+from engine.lazy import LazyModule
+
+np = LazyModule("numpy")                # Scalar evaluation needs no numpy
+
+
+class CompiledSlabTariff:
+    """
+    Slab table with cumulative thresholds and charges precomputed once.
+
+    Slabs use the same format as SlabCalculator: "upto" is the width of
+    the slab (None = unbounded), "rate" is ₹/kWh.
+    """
+
+    _cache = {}
+
+    def __init__(self, slabs):
+        self.rates = []
+        self.widths = []
+        self.lower = []           # Units consumed before the slab starts
+        self.upper = []           # Units consumed when the slab is full
+        self.charge_before = []   # Charge for all slabs before this one
+
+        consumed = 0
+        total = 0
+
+        for slab in slabs:
+            limit = slab["upto"]
+            rate = slab["rate"]
+
+            self.rates.append(rate)
+            self.lower.append(consumed)
+            self.charge_before.append(total)
+
+            if limit is None:
+                self.widths.append(None)
+                self.upper.append(float("inf"))
+                break
+
+            self.widths.append(limit)
+            consumed += limit
+            total += limit * rate
+            self.upper.append(consumed)
+
+        self.max_charge = total
+        self._arrays = None
+
+    @classmethod
+    def compile(cls, slabs):
+        key = tuple((slab["upto"], slab["rate"]) for slab in slabs)
+
+        compiled = cls._cache.get(key)
+        if compiled is None:
+            compiled = cls._cache[key] = cls(slabs)
+
+        return compiled
+
+    def energy(self, units):
+        """
+        Energy charge for scalar units (binary search) or an array of
+        units (np.searchsorted).
+        """
+        if isinstance(units, (int, float)):
+            return self._energy_scalar(units)
+        return self._energy_array(units)
+
+    def breakup(self, units):
+        if units <= 0:
+            return []
+
+        k = bisect_left(self.upper, units)
+
+        breakup = [
+            {
+                "units": self.widths[i],
+                "rate": self.rates[i],
+                "amount": self.widths[i] * self.rates[i]
+            }
+            for i in range(min(k, len(self.rates)))
+        ]
+
+        if k < len(self.rates):
+            slab_units = units - self.lower[k]
+            breakup.append({
+                "units": slab_units,
+                "rate": self.rates[k],
+                "amount": slab_units * self.rates[k]
+            })
+
+        return breakup
+
+    def calculate(self, units, breakup=True):
+        """
+        Drop-in for SlabCalculator.calculate; the breakup list is only
+        built when asked for.
+        """
+        energy = self._energy_scalar(units)
+        return energy, (self.breakup(units) if breakup else None)
+
+    def _energy_scalar(self, units):
+        if units <= 0:
+            return 0
+
+        k = bisect_left(self.upper, units)
+        if k == len(self.rates):
+            return self.max_charge
+
+        return self.charge_before[k] + (units - self.lower[k]) * self.rates[k]
+
+    def _energy_array(self, units):
+        units = np.asarray(units, dtype=np.float64)
+        if not self.rates:
+            return np.zeros_like(units)
+
+        upper, lower, rates, charge_before = self._as_arrays()
+
+        k = np.searchsorted(upper, units, side="left")
+        energy = charge_before[k] + (units - lower[k]) * rates[k]
+
+        return np.where(units > 0, energy, 0.0)
+
+    def _as_arrays(self):
+        if self._arrays is None:
+            # One padding slot past the last slab for units beyond a
+            # capped table: zero rate, full charge.
+            self._arrays = (
+                np.array(self.upper, dtype=np.float64),
+                np.array(self.lower + [self.upper[-1]], dtype=np.float64),
+                np.array(self.rates + [0.0], dtype=np.float64),
+                np.array(self.charge_before + [self.max_charge], dtype=np.float64),
+            )
+        return self._arrays
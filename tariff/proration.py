@@ -0,0 +1,121 @@
+from datetime import date as Date, timedelta
+
+import numpy as np
+
+from tariff.compiled_slab import CompiledSlabTariff
+from tariff.tariff_change import TariffChange
+
+
+class TariffProration:
+    """
+    Mid-cycle tariff revision, prorated by days.
+
+    For a period of `days` with the new tariff effective on `change_day`
+    (1-based), a consumer's units, slab widths and fixed charge are split
+    in the ratio oldTariffDays : newTariffDays, and each part is billed
+    on its own version. The prorated slab tables are compiled once per
+    (version, share), so the whole fleet is billed in one vectorised
+    pass per tariff instead of twice through the scalar path.
+    """
+
+    @staticmethod
+    def scaled_table(tariff, share):
+        """Compiled slab table with every bounded slab width scaled by share."""
+        return CompiledSlabTariff.compile([
+            {"upto": None if s["upto"] is None else s["upto"] * share, "rate": s["rate"]}
+            for s in tariff.slabs
+        ])
+
+    @staticmethod
+    def prorate_batch(units, tariff_ids, old_tariffs, new_tariffs, days, change_day):
+        """
+        units       : period units per consumer
+        tariff_ids  : index into old_tariffs / new_tariffs per consumer
+                      (new_tariffs[t] replaces old_tariffs[t])
+        change_day  : 1..days + 1 (days + 1: the new tariff starts after
+                      the period, so the old one bills all of it)
+        Returns column arrays, one value per consumer.
+        """
+        units = np.asarray(units, dtype=np.float64)
+        tariff_ids = np.asarray(tariff_ids, dtype=np.intp)
+
+        if not 1 <= change_day <= days + 1:
+            raise ValueError("change_day must be between 1 and days + 1")
+
+        split = TariffChange.split(days, change_day)
+        old_share = split["oldTariffDays"] / days
+        new_share = split["newTariffDays"] / days
+
+        old_units = units * old_share
+        new_units = units - old_units
+
+        columns = {
+            "oldUnits": old_units,
+            "newUnits": new_units,
+            "oldEnergy": np.zeros_like(units),
+            "newEnergy": np.zeros_like(units),
+            "oldFixed": np.zeros_like(units),
+            "newFixed": np.zeros_like(units),
+            "oldDuty": np.zeros_like(units),
+            "newDuty": np.zeros_like(units),
+        }
+
+        for t in np.unique(tariff_ids).tolist():
+            rows = tariff_ids == t
+            for part, tariff, share, part_units in (
+                ("old", old_tariffs[t], old_share, old_units),
+                ("new", new_tariffs[t], new_share, new_units),
+            ):
+                if share == 0:
+                    continue
+                energy = TariffProration.scaled_table(tariff, share).energy(part_units[rows])
+                columns[part + "Energy"][rows] = energy
+                columns[part + "Fixed"][rows] = tariff.fixed_charge * share
+                columns[part + "Duty"][rows] = energy * tariff.duty_rate
+
+        columns["total"] = sum(
+            columns[part + charge]
+            for part in ("old", "new")
+            for charge in ("Energy", "Fixed", "Duty")
+        )
+        columns["oldTariffDays"] = split["oldTariffDays"]
+        columns["newTariffDays"] = split["newTariffDays"]
+        return columns
+
+    @staticmethod
+    def prorate(units, old_tariff, new_tariff, days, change_day):
+        """Single consumer, as a frontend-ready dict."""
+        c = TariffProration.prorate_batch(
+            [units], [0], [old_tariff], [new_tariff], days, change_day)
+
+        def part(name):
+            return {
+                "days": c[name + "TariffDays"],
+                "units": round(float(c[name + "Units"][0]), 2),
+                "energy": round(float(c[name + "Energy"][0]), 2),
+                "fixed": round(float(c[name + "Fixed"][0]), 2),
+                "duty": round(float(c[name + "Duty"][0]), 2)
+            }
+
+        return {
+            "total": round(float(c["total"][0]), 2),
+            "oldTariff": part("old"),
+            "newTariff": part("new")
+        }
+
+    @staticmethod
+    def from_registry(registry, category, period_start, days):
+        """
+        (old_version, new_version, change_day) when a new version of the
+        category takes effect inside the period, else None. With several
+        revisions in one period the version in force at period end wins.
+        """
+        start = period_start if isinstance(period_start, Date) else \
+            Date.fromisoformat(str(period_start)[:10])
+        end = start + timedelta(days=days - 1)
+
+        old = registry.resolve(category, start)
+        new = registry.resolve(category, end)
+        if new is old:
+            return None
+        return old, new, (new.effective_from - start).days + 1
@@ -0,0 +1,182 @@
+from bisect import bisect_right
+from datetime import date as Date
+from types import MappingProxyType
+
+from models.tariff import Tariff
+from tariff.compiled_slab import CompiledSlabTariff
+
+
+def _as_date(value):
+    if isinstance(value, Date):
+        return value
+    return Date.fromisoformat(str(value)[:10])
+
+
+class TariffVersion:
+    """
+    Immutable, validated tariff version. Exposes the same attributes as
+    models.tariff.Tariff, so it can be passed wherever a Tariff is
+    expected, plus values derived once per version:
+
+    base_rate : lowest slab rate
+    compiled  : CompiledSlabTariff for the slab table
+    key       : hashable content key (identical tariffs compare equal)
+    """
+
+    __slots__ = (
+        "category", "effective_from", "slabs", "fixed_charge", "duty_rate",
+        "dps_monthly_rate", "demand_rate", "excess_demand_multiplier",
+        "base_rate", "compiled", "key",
+    )
+
+    def __init__(self, category, effective_from, tariff):
+        TariffVersion.validate(tariff)
+
+        values = {
+            "category": category,
+            "effective_from": _as_date(effective_from),
+            "slabs": tuple(
+                MappingProxyType({"upto": s["upto"], "rate": s["rate"]})
+                for s in tariff.slabs
+            ),
+            "fixed_charge": tariff.fixed_charge,
+            "duty_rate": tariff.duty_rate,
+            "dps_monthly_rate": tariff.dps_monthly_rate,
+            "demand_rate": tariff.demand_rate,
+            "excess_demand_multiplier": tariff.excess_demand_multiplier,
+        }
+        values["key"] = (
+            tuple((s["upto"], s["rate"]) for s in values["slabs"]),
+            values["fixed_charge"],
+            values["duty_rate"],
+            values["dps_monthly_rate"],
+            values["demand_rate"],
+            values["excess_demand_multiplier"],
+        )
+        values["base_rate"] = min(s["rate"] for s in values["slabs"])
+        values["compiled"] = CompiledSlabTariff.compile(values["slabs"])
+
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TariffVersion is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("TariffVersion is immutable")
+
+    def __reduce__(self):
+        # Rebuilt through __init__ (pickle, copy.deepcopy, worker processes):
+        # the immutable slots and read-only slabs cannot be restored in place
+        tariff = Tariff(
+            [dict(s) for s in self.slabs], self.fixed_charge, self.duty_rate,
+            self.dps_monthly_rate, self.demand_rate, self.excess_demand_multiplier)
+        return TariffVersion, (self.category, self.effective_from, tariff)
+
+    def __eq__(self, other):
+        return isinstance(other, TariffVersion) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return "TariffVersion(%r, %s)" % (self.category, self.effective_from)
+
+    @staticmethod
+    def validate(tariff):
+        slabs = list(tariff.slabs)
+        if not slabs:
+            raise ValueError("Tariff must have at least one slab")
+
+        for i, slab in enumerate(slabs):
+            limit, rate = slab["upto"], slab["rate"]
+
+            if rate < 0:
+                raise ValueError("Slab %d has a negative rate" % i)
+            if limit is None:
+                if i != len(slabs) - 1:
+                    raise ValueError("Only the last slab may be unbounded")
+            elif limit <= 0:
+                raise ValueError("Slab %d must have a positive width" % i)
+
+        for name in ("fixed_charge", "duty_rate", "dps_monthly_rate",
+                     "demand_rate", "excess_demand_multiplier"):
+            if getattr(tariff, name) < 0:
+                raise ValueError("%s must not be negative" % name)
+
+
+class TariffRegistry:
+    """
+    Tariff versions per category, keyed by effective date.
+
+    resolve(category, date) is a single dict lookup once a
+    (category, date) pair has been seen; the first lookup bisects the
+    category's effective dates.
+    """
+
+    def __init__(self):
+        self._dates = {}        # category -> sorted effective dates
+        self._versions = {}     # category -> versions, same order
+        self._resolved = {}     # (category, date as given) -> version
+
+    def register(self, category, effective_from, tariff):
+        version = TariffVersion(category, effective_from, tariff)
+
+        dates = self._dates.setdefault(category, [])
+        versions = self._versions.setdefault(category, [])
+
+        i = bisect_right(dates, version.effective_from)
+        if i and dates[i - 1] == version.effective_from:
+            if versions[i - 1] == version:
+                return versions[i - 1]
+            raise ValueError(
+                "%s already has a different tariff effective %s"
+                % (category, version.effective_from)
+            )
+
+        dates.insert(i, version.effective_from)
+        versions.insert(i, version)
+        self._resolved.clear()
+        return version
+
+    def register_category(self, category, effective_from, cat):
+        """
+        Register a simulator-style category dict, whose slabs are
+        cumulative {"Upto KWh", "Rate (₹)"} thresholds in any order.
+        """
+        slabs = []
+        previous = 0
+        for slab in sorted(cat["slabs"], key=lambda s: s["Upto KWh"]):
+            slabs.append({"upto": slab["Upto KWh"] - previous, "rate": slab["Rate (₹)"]})
+            previous = slab["Upto KWh"]
+
+        tariff = Tariff(
+            slabs,
+            cat["fixed_charge"],
+            duty_rate=cat.get("duty_rate", 0.0),
+            demand_rate=cat.get("demand_rate", 0.0)
+        )
+        return self.register(category, effective_from, tariff)
+
+    def resolve(self, category, on_date):
+        key = (category, on_date)
+        version = self._resolved.get(key)
+        if version is None:
+            version = self._resolved[key] = self._lookup(category, on_date)
+        return version
+
+    def current(self, category):
+        return self._versions[category][-1]
+
+    def versions(self, category):
+        return tuple(self._versions.get(category, ()))
+
+    def _lookup(self, category, on_date):
+        dates = self._dates.get(category)
+        if not dates:
+            raise KeyError("Unknown tariff category %r" % (category,))
+
+        i = bisect_right(dates, _as_date(on_date))
+        if i == 0:
+            raise KeyError("No %s tariff effective on %s" % (category, on_date))
+        return self._versions[category][i - 1]
@@ -1,27 +1,7 @@
-class SlabCalculator:
-
-    def calculate(self, units, slabs):
-        remaining = units
-        total = 0
-        breakup = []
-
-        for slab in slabs:
-            if remaining <= 0:
-                break
+from tariff.compiled_slab import CompiledSlabTariff
 
-            limit = slab["upto"]
-            rate = slab["rate"]
 
-            slab_units = remaining if limit is None else min(remaining, limit)
-            amount = slab_units * rate
-
-            breakup.append({
-                "units": slab_units,
-                "rate": rate,
-                "amount": amount
-            })
-
-            total += amount
-            remaining -= slab_units
+class SlabCalculator:
 
-        return total, breakup
+    def calculate(self, units, slabs):
+        return CompiledSlabTariff.compile(slabs).calculate(units)
@@ -0,0 +1,104 @@
+import numpy as np
+
+
+def _minutes(hhmm):
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class TodTariff:
+    """
+    Time-of-Day energy tariff.
+
+    energy_rate : normal ₹/kWh
+    windows     : list of {"name", "start", "end", "factor"} with "HH:MM"
+                  times; a window may wrap past midnight. factor > 1 is a
+                  surcharge (peak), factor < 1 a rebate (off-peak). Time
+                  outside every window is billed as "NORMAL" (factor 1).
+    """
+
+    NORMAL = "NORMAL"
+
+    def __init__(self, energy_rate, windows):
+        self.energy_rate = energy_rate
+        self.windows = list(windows)
+        self.names = [self.NORMAL] + [w["name"] for w in self.windows]
+        self.factors = np.array(
+            [1.0] + [w["factor"] for w in self.windows], dtype=np.float64)
+        self._slots = {}
+
+    def slot_codes(self, interval_minutes):
+        """Window code (index into names) for each interval of a day."""
+        codes = self._slots.get(interval_minutes)
+        if codes is None:
+            if 1440 % interval_minutes:
+                raise ValueError("interval_minutes must divide a day")
+
+            starts = np.arange(0, 1440, interval_minutes)
+            codes = np.zeros(len(starts), dtype=np.intp)
+
+            # Later windows win where windows overlap
+            for code, window in enumerate(self.windows, start=1):
+                start, end = _minutes(window["start"]), _minutes(window["end"])
+                if start < end:
+                    inside = (starts >= start) & (starts < end)
+                else:
+                    inside = (starts >= start) | (starts < end)
+                codes[inside] = code
+
+            self._slots[interval_minutes] = codes
+        return codes
+
+
+class TodBilling:
+    """
+    Vectorised ToD energy billing over interval load profiles.
+    """
+
+    @staticmethod
+    def calculate(profile, tod, interval_minutes=15, start_slot=0):
+        """
+        profile   : kWh per interval, shape (intervals,) for one consumer
+                    or (consumers, intervals) for a batch
+        start_slot: interval-of-day of the first reading (0 = 00:00)
+
+        Returns per-window units and charges plus the totals, as arrays
+        over consumers (scalars for a 1-D profile).
+        """
+        profile = np.asarray(profile, dtype=np.float64)
+        single = profile.ndim == 1
+        profile = np.atleast_2d(profile)
+
+        codes = tod.slot_codes(interval_minutes)
+        n = profile.shape[1]
+        window = codes[(np.arange(n) + start_slot) % len(codes)]
+
+        # (intervals x windows) one-hot, so per-window sums are one matmul
+        onehot = np.zeros((n, len(tod.names)))
+        onehot[np.arange(n), window] = 1.0
+        units = profile @ onehot
+
+        charges = units * (tod.energy_rate * tod.factors)
+        adjustment = charges - units * tod.energy_rate
+
+        result = {
+            "units": dict(zip(tod.names, units.T)),
+            "charges": dict(zip(tod.names, charges.T)),
+            "totalUnits": units.sum(axis=1),
+            "energy": charges.sum(axis=1),
+            "rebate": -np.where(adjustment < 0, adjustment, 0.0).sum(axis=1),
+            "surcharge": np.where(adjustment > 0, adjustment, 0.0).sum(axis=1),
+        }
+
+        if single:
+            result = {
+                key: ({k: float(v[0]) for k, v in value.items()}
+                      if isinstance(value, dict) else float(value[0]))
+                for key, value in result.items()
+            }
+        return result
+
+    @staticmethod
+    def calculate_meter(meter, tod, interval_minutes=15, start_slot=0):
+        return TodBilling.calculate(
+            meter.load_profile, tod, interval_minutes, start_slot)
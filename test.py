@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from tariff.registry import TariffRegistry
 
 # ==========================================
 # 1. DATA MANAGER (In-Memory DB)
@@ -21,19 +22,35 @@ class DataManager:
                     "slabs": [{"Upto KWh": 100, "Rate (₹)": 5.50}, {"Upto KWh": 999999, "Rate (₹)": 6.50}]
                 }
             }
+        if 'tariffs' not in st.session_state:
+            st.session_state.tariffs = TariffRegistry()
+            for cat_id, cat in st.session_state.categories.items():
+                st.session_state.tariffs.register_category(cat_id, "2000-01-01", cat)
         if 'consumers' not in st.session_state: st.session_state.consumers = {}
         if 'ledger' not in st.session_state: st.session_state.ledger = []
         if 'readings' not in st.session_state: st.session_state.readings = []
+        if 'month_to_date' not in st.session_state: st.session_state.month_to_date = {}
         if 'settlements' not in st.session_state: st.session_state.settlements = []
 
     @staticmethod
     def get_tariff(cat_id): return st.session_state.categories.get(cat_id)
     @staticmethod
+    def get_tariff_version(cat_id): return st.session_state.tariffs.current(cat_id)
+    @staticmethod
     def save_consumer(consumer): st.session_state.consumers[consumer.consumer_id] = consumer
     @staticmethod
     def get_consumer(c_id): return st.session_state.consumers.get(c_id)
     @staticmethod
-    def add_reading_log(data): st.session_state.readings.append(data)
+    def add_reading_log(data):
+        st.session_state.readings.append(data)
+        # Month-to-date settlement accumulator, updated with every daily bill
+        key = (data['Consumer ID'], str(data['Date'])[:7])
+        acc = st.session_state.month_to_date.setdefault(key, {"units": 0.0, "deducted": 0.0, "days": 0})
+        acc["units"] += data['Units']
+        acc["deducted"] += data['Net EC'] + data['FC'] + data['Duty']
+        acc["days"] += 1
+    @staticmethod
+    def get_month_to_date(c_id, month_str): return st.session_state.month_to_date.get((c_id, month_str))
     @staticmethod
     def add_ledger_entry(date, c_id, desc, amount, type_, balance):
         st.session_state.ledger.append({
@@ -108,22 +125,6 @@ class MigrationEngine:
             DataManager.add_ledger_entry(datetime.now().date(), c.consumer_id, "Opening Balance", new_wallet, "CREDIT", new_wallet)
         return c
 
-class SlabEngine:
-    @staticmethod
-    def calculate_energy_charge(units, slabs):
-        sorted_slabs = sorted(slabs, key=lambda x: x['Upto KWh'])
-        charge = 0.0
-        remaining_units = units
-        prev_limit = 0
-        for slab in sorted_slabs:
-            slab_size = slab['Upto KWh'] - prev_limit
-            if remaining_units <= 0: break
-            units_in_slab = min(remaining_units, slab_size)
-            charge += units_in_slab * slab['Rate (₹)']
-            remaining_units -= units_in_slab
-            prev_limit = slab['Upto KWh']
-        return charge
-
 class PrepaidDailyBilling:
     def run(self, consumer, current_kwh, max_demand, date_str, is_meter_change=False):
         tariff = DataManager.get_tariff(consumer.category_id)
@@ -133,7 +134,7 @@ class PrepaidDailyBilling:
         units_consumed = current_kwh - consumer.last_reading
         if units_consumed < 0: return {"error": "Negative Consumption"}
         
-        base_rate = min(tariff['slabs'], key=lambda x: x['Rate (₹)'])['Rate (₹)']
+        base_rate = DataManager.get_tariff_version(consumer.category_id).base_rate
         gross_ec = units_consumed * base_rate
         subsidy = units_consumed * tariff.get('subsidy_rate', 0.0)
         net_ec = max(0, gross_ec - subsidy)
@@ -189,12 +190,12 @@ class MonthlySettlementEngine:
     @staticmethod
     def run_settlement(consumer, month_str):
         tariff = DataManager.get_tariff(consumer.category_id)
-        logs = [l for l in st.session_state.readings if l['Consumer ID'] == consumer.consumer_id and month_str in str(l['Date'])]
-        if not logs: return {"status": "FAILED", "reason": "No logs for month"}
+        acc = DataManager.get_month_to_date(consumer.consumer_id, month_str)
+        if not acc: return {"status": "FAILED", "reason": "No logs for month"}
             
-        total_units = sum(l['Units'] for l in logs)
+        total_units = acc["units"]
         
-        gross_ec = SlabEngine.calculate_energy_charge(total_units, tariff['slabs'])
+        gross_ec = DataManager.get_tariff_version(consumer.category_id).compiled.energy(total_units)
         total_subsidy = total_units * tariff.get('subsidy_rate', 0.0)
         net_ec = max(0, gross_ec - total_subsidy)
         
@@ -202,7 +203,7 @@ class MonthlySettlementEngine:
         duty = (net_ec + fixed_charge) * tariff['duty_rate']
         
         shadow_bill = net_ec + fixed_charge + duty
-        daily_deducted = sum(l['Net EC'] + l['FC'] + l['Duty'] for l in logs)
+        daily_deducted = acc["deducted"]
         adjustment = shadow_bill - daily_deducted
         
         status = "SUCCESS"